@@ -0,0 +1,115 @@
+"""dict 항목과 TodoRecord의 메모리/월별 집계 비용 비교.
+
+    cd fastapi-app && python benchmarks/bench_memory.py [항목 수]
+
+todo.json에서 읽은 dict 그대로 보관하던 방식과, 수집 시 한 번 검증해
+TodoRecord로 보관하는 방식을 같은 데이터(기본 100,000개)로 비교한다.
+"""
+
+import datetime
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import Priority, TodoRecord, TodoStatus
+
+
+def make_todos(count):
+    rng = random.Random(0)
+    start = datetime.date(2025, 1, 1)
+    todos = []
+    for todo_id in range(count):
+        due_date = start + datetime.timedelta(days=rng.randrange(365))
+        todos.append(
+            {
+                "id": todo_id,
+                "title": f"Task {todo_id}",
+                "description": "벤치마크용 항목",
+                "due_date": due_date.isoformat() if rng.random() < 0.9 else None,
+                "status": rng.choice([status.value for status in TodoStatus]),
+                "priority": rng.choice([None, *(p.value for p in Priority)]),
+                "subtasks": [],
+                "attachments": [],
+            }
+        )
+    # 파일에서 읽은 것과 같게 문자열이 항목마다 따로 만들어지도록 한다
+    return json.dumps(todos)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used, elapsed
+
+
+def monthly_from_dicts(todos):
+    # 기존 get_monthly_stats와 같은 방식 (요청마다 strptime)
+    stats = {}
+    for todo in todos:
+        if todo.get("due_date"):
+            month = datetime.datetime.strptime(todo["due_date"], "%Y-%m-%d").strftime(
+                "%Y-%m"
+            )
+            entry = stats.setdefault(month, [0, 0])
+            entry[0] += 1
+            if todo["status"] == "완료":
+                entry[1] += 1
+    return stats
+
+
+def monthly_from_records(todos):
+    stats = {}
+    for todo in todos:
+        if todo.due_date is None:
+            continue
+        entry = stats.setdefault((todo.due_date.year, todo.due_date.month), [0, 0])
+        entry[0] += 1
+        if todo.status is TodoStatus.completed:
+            entry[1] += 1
+    return stats
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    raw = make_todos(count)
+
+    dicts, dict_bytes, dict_seconds = measure(lambda: json.loads(raw))
+    records, record_bytes, record_seconds = measure(
+        lambda: [TodoRecord.from_dict(todo) for todo in json.loads(raw)]
+    )
+
+    print(f"todos: {count:,}")
+    print(
+        f"dict:       {dict_bytes / count:7.0f} B/todo"
+        f"  ({dict_bytes / 2**20:6.1f} MiB, load {dict_seconds:.2f}s)"
+    )
+    print(
+        f"TodoRecord: {record_bytes / count:7.0f} B/todo"
+        f"  ({record_bytes / 2**20:6.1f} MiB, load+validate {record_seconds:.2f}s)"
+    )
+
+    for name, func, todos in (
+        ("dict", monthly_from_dicts, dicts),
+        ("TodoRecord", monthly_from_records, records),
+    ):
+        started = time.perf_counter()
+        func(todos)
+        print(
+            f"monthly stats ({name}): {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
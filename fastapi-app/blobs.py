@@ -0,0 +1,210 @@
+"""내용 주소 기반 첨부 파일 저장소."""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger("todo.blobs")
+
+BLOB_COUNT = Gauge("todo_attachment_blobs", "Stored attachment files")
+BLOB_BYTES = Gauge("todo_attachment_storage_bytes", "Bytes used by attachment files")
+
+# 업로드 도중 남은 임시 파일을 지우기까지의 시간(초)
+TEMP_MAX_AGE = 24 * 60 * 60
+TEMP_PREFIX = ".upload-"
+
+# 파일 이름에 붙여 둘 확장자 (/uploads에서 Content-Type을 정하는 데 쓰인다)
+EXTENSION_PATTERN = re.compile(r"\.[A-Za-z0-9]{1,16}")
+
+
+def extension(filename):
+    """filename의 확장자. 없거나 이름에 쓰기 곤란한 문자가 있으면 빈 문자열."""
+    ext = os.path.splitext(filename or "")[1]
+    return ext if EXTENSION_PATTERN.fullmatch(ext) else ""
+
+
+class BlobStore:
+    """파일 내용의 SHA-256에 원래 확장자를 붙여 이름으로 하는 첨부 파일 저장소.
+
+    내용과 확장자가 같은 파일은 한 번만 저장한다. 저장소 인덱스처럼
+    update(old, new)/clear()로 첨부 파일이 가리키는 파일 이름별 참조 수를 유지하며,
+    참조가 없는 파일은 collect()나 백그라운드 GC(gc_interval초마다)가 지운다.
+
+    여러 워커가 같은 디렉터리를 쓰면 다른 워커가 막 참조한 파일을 아직 모를 수 있다.
+    그래서 GC는 지우기 전에 sync()로 다른 워커의 변경을 반영하고, 수정된 지 grace초가
+    지나지 않은 파일은 건너뛴다 (이미 있는 내용을 다시 올리면 수정 시각을 갱신한다).
+    """
+
+    def __init__(self, directory, sync=None, gc_interval=None, grace=60.0):
+        self.directory = directory
+        self.sync = sync or (lambda: None)
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._refs = Counter()
+        # 업로드가 진행 중이라 아직 참조가 기록되지 않은 파일
+        self._pending = Counter()
+        # 참조 수가 0이 된 파일 (다음 GC 대상)
+        self._orphans = set()
+        self._sizes = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                self._sizes[entry.name] = entry.stat().st_size
+        self._report()
+        self._stop = threading.Event()
+        self._thread = None
+        if gc_interval:
+            self._thread = threading.Thread(
+                target=self._run, args=(gc_interval,), name="todo-blob-gc", daemon=True
+            )
+            self._thread.start()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _report(self):
+        BLOB_COUNT.set(len(self._sizes))
+        BLOB_BYTES.set(sum(self._sizes.values()))
+
+    # 참조 수 (저장소 인덱스)
+
+    def clear(self):
+        with self._lock:
+            self._orphans.update(self._refs)
+            self._refs.clear()
+
+    def update(self, old, new):
+        if old is not None and new is not None and old.attachments is new.attachments:
+            return
+        with self._lock:
+            if old is not None:
+                for attachment in old.attachments:
+                    name = attachment["filename"]
+                    self._refs[name] -= 1
+                    if self._refs[name] <= 0:
+                        del self._refs[name]
+                        self._orphans.add(name)
+            if new is not None:
+                for attachment in new.attachments:
+                    self._refs[attachment["filename"]] += 1
+
+    # 업로드
+
+    def put(self, upload):
+        """받은 업로드(uploads.ReceivedFile)를 내용 해시 이름으로 두고 그 이름을 반환한다.
+
+        이름은 해시에 업로드한 파일의 확장자를 붙인 것이다 (예: <sha256>.png).
+        같은 이름의 파일이 이미 있으면 다시 기록하지 않는다. 참조를 기록한 뒤에는
+        반드시 release()를 호출해야 한다.
+        """
+        name = upload.sha256 + extension(upload.filename)
+        path = self.path(name)
+        with self._lock:
+            self._pending[name] += 1
+            if os.path.exists(path):
+                os.utime(path)
+                return name
+        try:
+            upload.persist(path)
+        except BaseException:
+            # 이름을 돌려주지 못하면 호출한 쪽이 release()할 수 없으므로 여기서 정리한다
+            with self._lock:
+                self._unpend(name)
+            upload.discard()
+            raise
+        with self._lock:
+            self._sizes[name] = upload.size
+            self._report()
+        return name
+
+    def _unpend(self, name):
+        self._pending[name] -= 1
+        if self._pending[name] <= 0:
+            del self._pending[name]
+
+    def release(self, name, upload):
+        """put() 이후 참조 기록이 끝났을 때(실패 포함) 호출한다."""
+        with self._lock:
+            self._unpend(name)
+            if upload.pending:
+                # 이미 있던 내용이었다. 그 사이 다른 워커의 GC가 지웠다면 되살린다
+                if self._refs.get(name) and not os.path.exists(self.path(name)):
+                    upload.persist(self.path(name))
+                    self._sizes[name] = upload.size
+                    self._report()
+                else:
+                    upload.discard()
+        self.collect([name])
+
+    # 정리
+
+    def collect(self, names, grace=0):
+        """names 중 참조가 없는 파일을 지우고 지운 개수를 반환한다.
+
+        grace초 안에 수정된 파일은 남긴다.
+        """
+        self.sync()
+        removed = 0
+        now = time.time()
+        with self._lock:
+            for name in names:
+                self._orphans.discard(name)
+                if self._refs.get(name) or self._pending.get(name):
+                    continue
+                path = self.path(name)
+                try:
+                    if grace and now - os.stat(path).st_mtime < grace:
+                        self._orphans.add(name)
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                self._sizes.pop(name, None)
+            self._report()
+        return removed
+
+    def gc(self):
+        """참조가 없는 파일과 오래된 임시 파일을 지운다. 지운 파일 수를 반환한다."""
+        now = time.time()
+        sizes = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.startswith(TEMP_PREFIX):
+                if now - entry.stat().st_mtime > TEMP_MAX_AGE:
+                    os.remove(entry.path)
+            elif not entry.name.startswith("."):
+                sizes[entry.name] = entry.stat().st_size
+        with self._lock:
+            # 다른 워커가 올린 파일도 사용량에 반영한다
+            self._sizes = sizes
+            candidates = set(sizes) | self._orphans
+        return self.collect(candidates, self.grace)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                removed = self.gc()
+                if removed:
+                    logger.info("Removed %d unreferenced attachment files", removed)
+            except Exception:
+                logger.exception("Attachment garbage collection failed")
+
+    def usage(self):
+        with self._lock:
+            return {
+                "files": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+                "references": sum(self._refs.values()),
+                "referenced_files": len(self._refs),
+            }
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,105 @@
+"""대시보드 조회 결과 캐시."""
+
+import datetime
+import threading
+
+from prometheus_client import Counter
+
+from metrics import timed
+from models import TodoStatus
+
+CACHE_REQUESTS = Counter(
+    "todo_result_cache_requests_total",
+    "Dashboard result cache lookups",
+    ["name", "result"],
+)
+
+
+class ResultCache:
+    """이름별 조회 결과 캐시. 저장소 인덱스처럼 update(old, new)와 clear()로 무효화된다.
+
+    이름마다 결과가 항목의 어떤 값에 의존하는지 key 함수로 등록하고,
+    변경 전후 key가 다를 때만 그 이름의 결과를 비운다.
+    결과는 계산한 날짜가 지나면(자정) 만료된다.
+    """
+
+    def __init__(self, max_entries=64, today=None):
+        self.max_entries = max_entries
+        self.today = today or (lambda: datetime.datetime.now().date())
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._entries = {}
+        self._generations = {}
+
+    def register(self, name, key):
+        with self._lock:
+            self._keys[name] = key
+            self._entries[name] = {}
+            self._generations[name] = 0
+
+    def _invalidate(self, name):
+        self._entries[name] = {}
+        self._generations[name] += 1
+
+    def clear(self):
+        with self._lock:
+            for name in self._keys:
+                self._invalidate(name)
+
+    def update(self, old, new):
+        with self._lock:
+            for name, key in self._keys.items():
+                old_key = key(old) if old is not None else None
+                new_key = key(new) if new is not None else None
+                if old_key != new_key:
+                    self._invalidate(name)
+
+    def get(self, name, params, compute):
+        """캐시된 결과를 반환하고, 없으면 compute()로 계산해 저장한다."""
+        today = self.today()
+        with self._lock:
+            entry = self._entries[name].get(params)
+            generation = self._generations[name]
+        if entry is not None and entry[0] == today:
+            CACHE_REQUESTS.labels(name, "hit").inc()
+            return entry[1]
+
+        CACHE_REQUESTS.labels(name, "miss").inc()
+        with timed("compute"):
+            result = compute()
+        with self._lock:
+            # 계산하는 동안 무효화되었다면 이미 오래된 결과이므로 저장하지 않는다
+            if self._generations[name] == generation:
+                entries = self._entries[name]
+                if len(entries) >= self.max_entries:
+                    del entries[next(iter(entries))]
+                entries[params] = (today, result)
+        return result
+
+
+# 결과가 의존하는 항목 값 (key 함수)
+
+
+def dashboard_key(todo):
+    # 요약/분포는 상태와 우선순위에, 마감 임박/연체/최근 목록은 마감일이 있는
+    # 항목 전체에 의존한다
+    return todo.status, todo.priority, todo if todo.due_date is not None else None
+
+
+def completion_trend_key(todo):
+    return todo.due_date, todo.status
+
+
+def priority_completion_key(todo):
+    return todo.priority, todo.status
+
+
+def monthly_stats_key(todo):
+    return todo.due_date, todo.status, todo.priority
+
+
+def due_alerts_key(todo):
+    # 알림 목록에는 마감일이 있는 미완료 항목이 통째로 담긴다
+    if todo.due_date is None or todo.status is TodoStatus.completed:
+        return None
+    return todo
@@ -0,0 +1,102 @@
+"""변경 이벤트 방송 (Server-Sent Events)."""
+
+import asyncio
+import threading
+from collections import deque
+
+from prometheus_client import Counter, Gauge
+
+SUBSCRIBERS = Gauge("todo_event_subscribers", "Connected event stream subscribers")
+OVERFLOWS = Counter(
+    "todo_event_overflows_total", "Subscriber queues dropped for a resync"
+)
+
+
+class Subscriber:
+    """구독자 하나의 이벤트 큐.
+
+    큐가 max_events개를 넘으면(읽는 쪽이 느리면) 쌓인 이벤트를 버리고
+    resync 이벤트 하나로 바꾼다. 구독자는 이를 받으면 전체를 다시 읽어야 한다.
+    """
+
+    def __init__(self, loop, max_events):
+        self._loop = loop
+        self._max_events = max_events
+        self._events = deque()
+        # put은 저장소 락을 잡은 작업 스레드에서, get은 이벤트 루프에서 호출된다
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def put(self, event):
+        with self._lock:
+            if len(self._events) >= self._max_events:
+                OVERFLOWS.inc()
+                self._events.clear()
+                event = {"type": "resync"}
+            elif self._events and self._events[0]["type"] == "resync":
+                return
+            self._events.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫혔다 (종료 중)
+            pass
+
+    async def get(self, timeout):
+        """쌓인 이벤트를 모두 꺼낸다. timeout 초 동안 없으면 빈 목록."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+class EventBroker:
+    """저장소 변경을 구독자에게 전달한다. 인덱스처럼 update(old, new)와 clear()로 갱신된다.
+
+    version은 이벤트 id로 쓸 현재 데이터 버전 문자열을 반환하는 함수로,
+    저장소 락 안에서 호출된다.
+    """
+
+    def __init__(self, version, max_events=256):
+        self.version = version
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_events)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.remove(subscriber)
+        SUBSCRIBERS.dec()
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def clear(self):
+        self.publish({"type": "resync", "version": self.version()})
+
+    def update(self, old, new):
+        if not self._subscribers:
+            return
+        if new is None:
+            event = {"type": "delete", "id": old.id}
+        else:
+            event = {"type": "upsert", "todo": new.to_dict()}
+        event["version"] = self.version()
+        self.publish(event)
@@ -0,0 +1,464 @@
+"""TodoStore가 변경 시점마다 갱신하는 보조 인덱스/집계.
+
+모든 인덱스는 update(old, new)와 clear()를 제공한다.
+update는 항목(TodoRecord)이 추가되면 old=None, 삭제되면 new=None으로 호출된다.
+"""
+
+import bisect
+import datetime
+import heapq
+import operator
+from collections import Counter, deque
+
+from models import TodoStatus
+
+COMPLETED = TodoStatus.completed
+NO_PRIORITY = "없음"
+_MISSING = object()
+
+
+class TodoCounts:
+    """상태/우선순위별 개수를 유지해 통계 요청을 데이터 크기와 무관하게 처리한다."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.by_status = Counter()
+        self.by_priority = Counter()
+        # (우선순위, 상태) 조합별 개수. 우선순위가 없는 항목은 "없음"으로 센다
+        self.by_priority_status = Counter()
+
+    @staticmethod
+    def _key(todo):
+        # Enum 멤버는 싱글턴이므로 비교/해시가 문자열 비교 없이 끝난다
+        return todo.priority, todo.status
+
+    def update(self, old, new):
+        if old is not None and new is not None and self._key(old) == self._key(new):
+            return
+        if old is not None:
+            self._count(old, -1)
+        if new is not None:
+            self._count(new, 1)
+
+    def _count(self, todo, delta):
+        priority, status = self._key(todo)
+        self.total += delta
+        _add(self.by_status, status, delta)
+        if priority is not None:
+            _add(self.by_priority, priority, delta)
+        _add(self.by_priority_status, (priority, status), delta)
+
+    def snapshot(self):
+        """키를 문자열 값으로 바꾼 복사본."""
+        return {
+            "total": self.total,
+            "by_status": {status.value: n for status, n in self.by_status.items()},
+            "by_priority": {
+                priority.value: n for priority, n in self.by_priority.items()
+            },
+            "by_priority_status": {
+                (priority.value if priority else NO_PRIORITY, status.value): n
+                for (priority, status), n in self.by_priority_status.items()
+            },
+        }
+
+
+def _add(counter, key, delta):
+    # 0이 된 키는 지워 처음 등장한 순서가 실제 데이터와 맞게 유지되도록 한다
+    counter[key] += delta
+    if counter[key] == 0:
+        del counter[key]
+
+
+class _Fenwick:
+    """date.toordinal()을 위치로 쓰는 희소 펜윅 트리 (점 갱신/누적합 모두 O(log))."""
+
+    SIZE = datetime.date.max.toordinal() + 1
+
+    def __init__(self):
+        self._tree = {}
+
+    def add(self, position, delta):
+        while position < self.SIZE:
+            self._tree[position] = self._tree.get(position, 0) + delta
+            position += position & -position
+
+    def prefix(self, position):
+        """1..position 구간의 합."""
+        total = 0
+        while position > 0:
+            total += self._tree.get(position, 0)
+            position -= position & -position
+        return total
+
+
+class DueDateHistogram:
+    """마감일별 (전체, 완료) 개수와 그 누적합.
+
+    완료율 추이는 "해당 날짜까지 마감인 항목 수"의 누적값이므로,
+    시작일까지의 누적합을 한 번 구한 뒤 하루씩 더해 나가면 O(log + days)에 계산된다.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._total = _Fenwick()
+        self._completed = _Fenwick()
+        self._daily_total = Counter()
+        self._daily_completed = Counter()
+
+    @staticmethod
+    def _key(todo):
+        if todo.due_date is None:
+            return None
+        return todo.due_date.toordinal(), todo.status is COMPLETED
+
+    def update(self, old, new):
+        old_key = self._key(old) if old is not None else None
+        new_key = self._key(new) if new is not None else None
+        if old_key == new_key:
+            return
+        if old_key is not None:
+            self._count(*old_key, -1)
+        if new_key is not None:
+            self._count(*new_key, 1)
+
+    def _count(self, ordinal, completed, delta):
+        self._total.add(ordinal, delta)
+        _add(self._daily_total, ordinal, delta)
+        if completed:
+            self._completed.add(ordinal, delta)
+            _add(self._daily_completed, ordinal, delta)
+
+    def cumulative(self, start, end):
+        """start~end 각 날짜에 대해 (날짜, 그날까지 마감 개수, 그중 완료 개수)를 반환한다."""
+        ordinal = start.toordinal()
+        total = self._total.prefix(ordinal)
+        completed = self._completed.prefix(ordinal)
+        result = [(start, total, completed)]
+        for ordinal in range(ordinal + 1, end.toordinal() + 1):
+            total += self._daily_total.get(ordinal, 0)
+            completed += self._daily_completed.get(ordinal, 0)
+            result.append((datetime.date.fromordinal(ordinal), total, completed))
+        return result
+
+
+class DueDateIndex:
+    """마감일 순으로 정렬된 항목 목록.
+
+    (마감일, 삽입 순번, id)를 키로 한 정렬 리스트를 bisect로 유지하므로
+    "오늘까지", "3일 이내" 같은 날짜 구간 조회는 결과 개수에 비례하는 비용으로 처리된다.
+    같은 마감일끼리는 저장소에 추가된 순서를 따른다.
+    include_completed가 False면 완료된 항목은 색인하지 않는다.
+    """
+
+    def __init__(self, include_completed=True):
+        self.include_completed = include_completed
+        self.clear()
+
+    def clear(self):
+        self._entries = []
+        self._keys = {}
+        self._items = {}
+        self._seq = {}
+        self._next_seq = 0
+
+    def update(self, old, new):
+        todo_id = (new if new is not None else old).id
+        if new is None:
+            self._seq.pop(todo_id, None)
+        elif todo_id not in self._seq:
+            self._seq[todo_id] = self._next_seq
+            self._next_seq += 1
+
+        key = self._key(new) if new is not None else None
+        old_key = self._keys.get(todo_id)
+        if key != old_key:
+            if old_key is not None:
+                del self._entries[bisect.bisect_left(self._entries, old_key)]
+                del self._keys[todo_id]
+            if key is not None:
+                bisect.insort(self._entries, key)
+                self._keys[todo_id] = key
+        if key is None:
+            self._items.pop(todo_id, None)
+        else:
+            self._items[todo_id] = new
+
+    def _key(self, todo):
+        if not self.include_completed and todo.status is COMPLETED:
+            return None
+        if todo.due_date is None:
+            return None
+        return todo.due_date.toordinal(), self._seq[todo.id], todo.id
+
+    def _bounds(self, start, end):
+        lo = (
+            0
+            if start is None
+            else bisect.bisect_left(self._entries, (start.toordinal(),))
+        )
+        hi = (
+            len(self._entries)
+            if end is None
+            else bisect.bisect_left(self._entries, (end.toordinal() + 1,))
+        )
+        return lo, hi
+
+    def between(self, start=None, end=None):
+        """마감일이 start~end(포함)인 (마감일, 항목) 목록. None은 제한 없음."""
+        lo, hi = self._bounds(start, end)
+        return [
+            (datetime.date.fromordinal(ordinal), self._items[todo_id])
+            for ordinal, _, todo_id in self._entries[lo:hi]
+        ]
+
+    def ids(self, start=None, end=None):
+        """마감일이 start~end(포함)인 항목 id (마감일 순)."""
+        lo, hi = self._bounds(start, end)
+        return [todo_id for _, _, todo_id in self._entries[lo:hi]]
+
+    def count(self, start=None, end=None):
+        """마감일이 start~end(포함)인 항목 수 (목록을 만들지 않는다)."""
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def latest(self, limit):
+        """마감일이 늦은 순으로 limit개. 같은 마감일끼리는 추가된 순서를 따른다."""
+        if limit <= 0:
+            return []
+        # 경계의 마감일이 같은 항목까지 포함해 가져온 뒤 정렬한다
+        start = max(len(self._entries) - limit, 0)
+        while start > 0 and self._entries[start - 1][0] == self._entries[start][0]:
+            start -= 1
+        entries = sorted(self._entries[start:], key=lambda entry: (-entry[0], entry[1]))
+        return [self._items[todo_id] for _, _, todo_id in entries[:limit]]
+
+
+class GroupIndex:
+    """key(항목) 값별 항목 id 집합. 조건 검색의 후보와 그 개수를 제공한다."""
+
+    def __init__(self, key):
+        self.key = key
+        self.clear()
+
+    def clear(self):
+        self._groups = {}
+
+    def update(self, old, new):
+        old_key = self.key(old) if old is not None else _MISSING
+        new_key = self.key(new) if new is not None else _MISSING
+        if old_key == new_key:
+            return
+        if old_key is not _MISSING:
+            group = self._groups[old_key]
+            group.discard(old.id)
+            if not group:
+                del self._groups[old_key]
+        if new_key is not _MISSING:
+            self._groups.setdefault(new_key, set()).add(new.id)
+
+    def count(self, values):
+        return sum(len(self._groups.get(value, ())) for value in values)
+
+    def ids(self, values):
+        """values 중 하나에 해당하는 항목 id (순서 없음)."""
+        ids = set()
+        for value in values:
+            ids.update(self._groups.get(value, ()))
+        return ids
+
+
+class SortedIds:
+    """id 오름차순으로 정렬된 항목 id 목록.
+
+    id는 바뀌지 않으므로 추가/삭제 때만 갱신되며, 커서(마지막 id) 이후의
+    한 페이지를 bisect로 찾아 결과 개수에 비례하는 비용으로 잘라낸다.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._ids = []
+
+    def update(self, old, new):
+        if old is None and new is not None:
+            bisect.insort(self._ids, new.id)
+        elif old is not None and new is None:
+            del self._ids[bisect.bisect_left(self._ids, old.id)]
+
+    def after(self, cursor, limit):
+        """cursor보다 큰 id를 오름차순으로 limit개. cursor가 None이면 처음부터."""
+        start = 0 if cursor is None else bisect.bisect_right(self._ids, cursor)
+        return self._ids[start : start + limit]
+
+
+def _grams(text):
+    """문자 단위 1-gram과 2-gram 집합.
+
+    한국어 제목은 공백 단위로 나누면 조사가 붙어 검색되지 않으므로 글자 단위로 색인한다.
+    한 글자 검색(입력 중 검색)을 위해 1-gram도 함께 둔다.
+    """
+    grams = set(text)
+    grams.update(map(operator.add, text, text[1:]))
+    return grams
+
+
+def _query_grams(term):
+    """부분 문자열 term을 포함하는 텍스트라면 반드시 가지고 있는 gram 목록."""
+    if len(term) == 1:
+        return [term]
+    return [term[i : i + 2] for i in range(len(term) - 1)]
+
+
+class NgramIndex:
+    """제목/설명의 문자 n-gram 역색인.
+
+    검색어의 모든 2-gram을 가진 항목만 후보로 추린 뒤(가장 작은 목록부터 교집합),
+    후보에 대해서만 실제 부분 문자열 포함 여부를 확인하고 점수를 매긴다.
+    공백으로 나뉜 여러 검색어는 모두 포함해야 한다(AND).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._texts = {}
+
+    @staticmethod
+    def _text(todo):
+        return todo.title.lower(), todo.description.lower()
+
+    def update(self, old, new):
+        new_text = self._text(new) if new is not None else None
+        if old is not None:
+            if new_text == self._texts.get(old.id):
+                return
+            self._remove(old.id)
+        if new is not None:
+            self._texts[new.id] = new_text
+            # 제목과 설명은 공백으로 이어 색인한다 (검색어에는 공백이 없으므로 경계 gram은 무해)
+            postings = self._postings
+            for gram in _grams(" ".join(new_text)):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = {new.id}
+                else:
+                    posting.add(new.id)
+
+    def _remove(self, todo_id):
+        for gram in _grams(" ".join(self._texts.pop(todo_id))):
+            posting = self._postings[gram]
+            posting.discard(todo_id)
+            if not posting:
+                del self._postings[gram]
+
+    def _candidates(self, term):
+        postings = [self._postings.get(gram) for gram in _query_grams(term)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, query, limit=None):
+        """검색어가 포함된 항목 id를 관련도 순으로 반환한다.
+
+        제목 일치가 설명 일치보다, 제목 시작 일치가 중간 일치보다 앞선다.
+        점수가 같으면 id 순이다.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return []
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            found = self._candidates(term)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+
+        ranked = []
+        for todo_id in candidates:
+            title, description = self._texts[todo_id]
+            score = 0
+            for term in terms:
+                if title.startswith(term):
+                    score += 4
+                elif term in title:
+                    score += 2
+                elif term in description:
+                    score += 1
+                else:
+                    break
+            else:
+                ranked.append((-score, todo_id))
+        if limit is not None and limit < len(ranked):
+            ranked = heapq.nsmallest(limit, ranked)
+        else:
+            ranked.sort()
+        return [todo_id for _, todo_id in ranked]
+
+
+class ChangeLog:
+    """항목별 변경 기록 (delta 동기화용).
+
+    변경마다 (저장소 버전, 항목 id, 삭제된 하위 작업 id, 삭제된 첨부 파일 id)를 남긴다.
+    retention개를 넘으면 오래된 기록부터 버리며, floor보다 이전 버전부터의 변경은
+    알 수 없으므로 since()가 None을 반환한다 (전체 재동기화 필요).
+    전체 교체(clear) 시에도 floor가 현재 버전으로 올라간다.
+    """
+
+    def __init__(self, version, retention=10000):
+        self._version = version
+        self.retention = retention
+        self.clear()
+
+    def clear(self):
+        self._entries = deque()
+        self.floor = self._version()
+
+    def update(self, old, new):
+        # 교체 직후 다시 채워지는 항목은 floor 이전과 구분할 수 없으므로 남기지 않는다
+        if self._version() <= self.floor:
+            return
+        todo = new if new is not None else old
+        removed_subtasks = removed_attachments = ()
+        if old is not None and new is not None:
+            removed_subtasks = _removed_ids(old.subtasks, new.subtasks)
+            removed_attachments = _removed_ids(old.attachments, new.attachments)
+        self._entries.append(
+            (self._version(), todo.id, removed_subtasks, removed_attachments)
+        )
+        if len(self._entries) > self.retention:
+            self.floor = self._entries.popleft()[0]
+
+    def since(self, version):
+        """version 이후 바뀐 항목 id(변경 순)와 삭제된 하위 작업/첨부 파일 (항목 id, id) 목록."""
+        if version < self.floor or version > self._version():
+            return None
+        changed = {}
+        removed_subtasks = []
+        removed_attachments = []
+        for entry in reversed(self._entries):
+            if entry[0] <= version:
+                break
+            changed[entry[1]] = None
+            removed_subtasks.extend((entry[1], child_id) for child_id in entry[2])
+            removed_attachments.extend((entry[1], child_id) for child_id in entry[3])
+        return (
+            list(reversed(changed)),
+            removed_subtasks[::-1],
+            removed_attachments[::-1],
+        )
+
+
+def _removed_ids(old_children, new_children):
+    if old_children is new_children:
+        return ()
+    remaining = {child["id"] for child in new_children}
+    return tuple(child["id"] for child in old_children if child["id"] not in remaining)
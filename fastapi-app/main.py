@@ -1,159 +1,468 @@
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-import json
+from contextlib import asynccontextmanager
+from pydantic_core import to_json
 import os
+import bisect
+import functools
+import inspect
+import json
 import logging
+import threading
 import time
-from multiprocessing import Queue
 from os import getenv
 from fastapi import Request
 import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from enum import Enum
+from starlette.concurrency import run_in_threadpool
 from prometheus_fastapi_instrumentator import Instrumentator
-from logging_loki import LokiQueueHandler
-import shutil
 import uuid
-from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+from access_log import AccessLogMiddleware, LokiBatchSink
+from blobs import BlobStore
+from events import EventBroker
+from metrics import DATA_FILE_BYTES, TODO_ITEMS, current_route, timed
+from profiler import Profiler, ProfileRequestMiddleware, format_collapsed
+from uploads import InvalidUpload, UploadTooLarge, receive_upload
+from cache import (
+    ResultCache,
+    completion_trend_key,
+    dashboard_key,
+    due_alerts_key,
+    monthly_stats_key,
+    priority_completion_key,
+)
+from models import (
+    Attachment,
+    Priority,
+    SubTask,
+    SubTaskPatch,
+    TodoBulkUpdate,
+    TodoIds,
+    TodoItem,
+    TodoPatch,
+    TodoStatus,
+)
+from storage import (
+    SORT_KEYS,
+    AttachmentNotFound,
+    SubtaskNotFound,
+    TodoAlreadyExists,
+    TodoNotFound,
+    TodoStore,
+    create_backend,
+)
 
 UPLOAD_DIRECTORY = "uploads"
 if not os.path.exists(UPLOAD_DIRECTORY):
     os.makedirs(UPLOAD_DIRECTORY)
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIRECTORY), name="uploads")
-
-Instrumentator().instrument(app).expose(app, endpoint="/metrics")
+# JSON 파일 경로
+TODO_FILE = "todo.json"
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# 완료율 추이 조회 가능한 최대 기간(일)
+MAX_TREND_DAYS = 3660
+ONE_DAY = datetime.timedelta(days=1)
+
+# GET /todos 페이지 크기 (limit 기본값/최대값)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 일괄 처리 요청 한 번에 받는 최대 항목 수
+MAX_BULK_ITEMS = 5000
+
+# 첨부 파일 다운로드를 nginx가 보내도록 할 때의 internal location 경로
+# (예: /protected-uploads/). 비어 있으면 워커가 직접 보낸다
+ATTACHMENT_ACCEL_PREFIX = getenv("TODO_ATTACHMENT_ACCEL_PREFIX", "")
+
+# 프로파일러 (TODO_PROFILER_TOKEN을 설정해야 켜지며, 이 토큰으로 인증한다)
+PROFILER_TOKEN = getenv("TODO_PROFILER_TOKEN", "")
+MAX_PROFILE_SECONDS = 60
+
+# 첨부 파일 최대 크기 (TODO_MAX_UPLOAD_MB, 기본 100MB)
+MAX_UPLOAD_BYTES = int(float(getenv("TODO_MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+
+# 시작 시 한 번만 로드하고 이후 읽기는 메모리에서 처리
+# TODO_STORAGE: wal(스냅샷 + 연산 로그), json(변경마다 전체 파일 기록),
+#               sqlite(todo.db, 여러 워커가 같은 데이터를 공유할 때)
+# TODO_COMMIT_WINDOW_MS: 동시에 들어온 변경을 모아 한 번에 기록하는 대기 시간(ms)
+store = TodoStore(
+    create_backend(
+        getenv("TODO_STORAGE", "wal"),
+        TODO_FILE,
+        durability=getenv("TODO_DURABILITY", "always"),
+        flush_interval=float(getenv("TODO_FLUSH_INTERVAL", "1.0")),
+    ),
+    commit_window=float(getenv("TODO_COMMIT_WINDOW_MS", "2")) / 1000,
 )
 
-loki_logs_handler = LokiQueueHandler(
-    Queue(-1),
-    url=getenv("LOKI_ENDPOINT"),
-    tags={"application": "fastapi"},
-    version="1",
+# 대시보드 결과 캐시 (관련 필드가 바뀌는 변경이 있거나 날짜가 바뀌면 다시 계산)
+result_cache = ResultCache()
+result_cache.register("dashboard", dashboard_key)
+result_cache.register("completion-trend", completion_trend_key)
+result_cache.register("priority-completion", priority_completion_key)
+result_cache.register("monthly-stats", monthly_stats_key)
+result_cache.register("due-alerts", due_alerts_key)
+store.add_index(result_cache)
+
+# 첨부 파일은 내용 해시 이름으로 한 번만 저장하고, 참조가 없어진 파일은
+# TODO_BLOB_GC_INTERVAL초마다 백그라운드에서 지운다
+blobs = BlobStore(
+    UPLOAD_DIRECTORY,
+    sync=store.version,
+    gc_interval=float(getenv("TODO_BLOB_GC_INTERVAL", "300")),
 )
+store.add_index(blobs)
 
-# Custom access logger (ignore Uvicorn's default logging)
-custom_logger = logging.getLogger("custom.access")
-custom_logger.setLevel(logging.INFO)
-
-# Add Loki handler (assuming `loki_logs_handler` is correctly configured)
-custom_logger.addHandler(loki_logs_handler)
-
+# 데이터 크기 (수집 시점에 계산)
+TODO_ITEMS.set_function(lambda: store.stats()["total"])
+DATA_FILE_BYTES.set_function(store.backend.data_bytes)
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time  # Compute response time
 
-    log_message = f'{request.client.host} - "{request.method} {request.url.path} HTTP/1.1" {response.status_code} {duration:.3f}s'
+class ImmutableStaticFiles(StaticFiles):
+    """파일 이름이 내용(해시/UUID)마다 고유해 바뀌지 않는 디렉터리용. 오래 캐시하게 한다."""
 
-    # **Only log if duration exists**
-    if duration:
-        custom_logger.info(log_message)
-
-    return response
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
-class TodoStatus(str, Enum):
-    not_started = "시작 전"
-    in_progress = "진행 중"
-    completed = "완료"
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if isinstance(access_log_sink, LokiBatchSink):
+        access_log_sink.close()
+    blobs.close()
+    store.close()
 
 
-class Priority(str, Enum):
-    high = "높음"
-    medium = "중간"
-    low = "낮음"
+async def track_route(request: Request):
+    # 단계별 시간 메트릭의 route 라벨 (스레드 풀에서 실행되는 핸들러에도 전달된다)
+    current_route.set(request.scope["route"].path)
 
 
-class SubTask(BaseModel):
-    id: int
-    title: str
-    completed: bool = False
-
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(track_route)])
+app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/uploads", ImmutableStaticFiles(directory=UPLOAD_DIRECTORY), name="uploads")
 
-class Attachment(BaseModel):
-    id: str
-    filename: str
-    original_filename: str
-    file_type: str
+Instrumentator().instrument(app).expose(app, endpoint="/metrics")
 
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
 
-# To-Do 항목 모델
-class TodoItem(BaseModel):
-    id: int
-    title: str
-    description: str
-    due_date: datetime.date | None
-    status: TodoStatus = TodoStatus.not_started
-    priority: Priority | None = None
-    subtasks: list[SubTask] = []
-    attachments: list[Attachment] = []
+# 접근 로그
+# LOKI_ENDPOINT가 있으면 모아서 gzip으로 압축해 Loki로 일괄 전송하고,
+# 없으면 custom.access 로거에 JSON 줄로 남긴다.
+# TODO_ACCESS_LOG_SAMPLE_RATE: 빠른(TODO_ACCESS_LOG_SLOW_MS 미만) 2xx/3xx 요청 중 남길 비율
+# (오류와 느린 요청은 항상 남긴다)
+custom_logger = logging.getLogger("custom.access")
+custom_logger.setLevel(logging.INFO)
 
+if getenv("LOKI_ENDPOINT"):
+    access_log_sink = LokiBatchSink(
+        getenv("LOKI_ENDPOINT"), labels={"application": "fastapi", "log": "access"}
+    )
+else:
 
-# JSON 파일 경로
-TODO_FILE = "todo.json"
+    def access_log_sink(line):
+        custom_logger.info(json.dumps(line, ensure_ascii=False))
 
 
-# JSON 파일에서 To-Do 항목 로드
+# 저장소의 To-Do 항목 조회 (호환용)
 def load_todos():
-    if os.path.exists(TODO_FILE):
-        with open(TODO_FILE, "r") as file:
-            return json.load(file)
-    return []
+    return [todo.to_dict() for todo in store.all()]
 
 
-# JSON 파일에 To-Do 항목 저장
+# 저장소의 To-Do 항목 전체 교체 (호환용)
 def save_todos(todos):
-    with open(TODO_FILE, "w") as file:
-        json.dump(todos, file, indent=4)
+    store.replace(todos)
+
+
+# 버전은 저장소마다 따로 매겨지므로 ETag와 since 값에 저장소 구분자를 넣는다.
+# sqlite는 모든 워커가 DB의 변경 번호를 공유하므로 어느 워커가 받아도 같은 값이고,
+# 파일 백엔드는 프로세스마다 다르다
+ETAG_INSTANCE = store.instance
+
+
+def current_etag():
+    # 대시보드의 남은 일수/연체 일수는 날짜에 따라 바뀌므로 오늘 날짜도 포함한다
+    today = datetime.datetime.now().date().isoformat()
+    return f'"{ETAG_INSTANCE}-{store.version()}-{today}"'
+
+
+def etag_matches(if_none_match, etag):
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_get(endpoint):
+    """조회 핸들러에 데이터 버전 기반 ETag를 붙이고, If-None-Match가 맞으면 304로 응답한다.
+
+    핸들러를 감싸므로 매개변수와 의존성 검증(422)이 끝난 뒤에 확인하고, 304 응답에도
+    CORS 헤더와 요청 메트릭이 그대로 적용된다. 그래서 감싸는 핸들러의 추가 검증은
+    본문이 아닌 의존성(select_fields 등)에서 해야 한다.
+    """
+    signature = inspect.signature(endpoint)
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, etag_request: Request, etag_response: Response, **kwargs):
+        # 응답을 만들기 전에 버전을 읽어야, 그 사이 변경이 있어도 ETag가 내용보다 앞서지 않는다
+        etag = current_etag()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(etag_request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        result = endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            if result.status_code == 200:
+                result.headers.update(headers)
+        else:
+            etag_response.headers.update(headers)
+        return result
+
+    # FastAPI가 요청/응답 객체를 함께 넘기도록 매개변수를 덧붙인다
+    wrapper.__signature__ = signature.replace(
+        parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(
+                "etag_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            ),
+            inspect.Parameter(
+                "etag_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response
+            ),
+        ]
+    )
+    return wrapper
+
+
+# 변경 이벤트 (GET /events)
+# 이벤트 id는 /todos/changes의 since로 쓸 수 있는 버전이다.
+events = EventBroker(lambda: f"{ETAG_INSTANCE}-{store.applied_version()}")
+store.add_index(events)
+# 이벤트가 없을 때 다른 워커(sqlite)의 변경을 확인하는 주기와 연결 유지 주석 주기(초)
+EVENT_POLL_INTERVAL = 1.0
+EVENT_HEARTBEAT_INTERVAL = 15.0
+
+
+# 저장소 데이터는 기록 시 이미 검증되었으므로 response_model 재검증 없이 바로 직렬화한다
+# (response_model은 OpenAPI 스키마에만 쓰인다)
+def json_response(content):
+    with timed("serialize"):
+        body = to_json(content)
+    return Response(content=body, media_type="application/json")
+
+
+# 조회 매개변수 검증
+# 핸들러 본문이 아닌 의존성에서 검증해, conditional_get의 ETag 비교(304)보다 먼저 422로 응답한다.
+
+
+def select_fields(
+    fields: str | None = Query(
+        None, description="응답에 담을 필드 (쉼표 구분, 예: id,title,status)"
+    ),
+    include_children: bool = Query(
+        True, description="false면 subtasks/attachments를 생략한다"
+    ),
+):
+    """fields 쿼리(쉼표 구분)를 응답에 담을 필드 목록으로 바꾼다. None은 전체."""
+    if fields is None:
+        selected = list(TodoItem.model_fields)
+    else:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in TodoItem.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=422, detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        # 커서로 쓰이는 id는 항상 포함한다
+        if "id" not in selected:
+            selected.insert(0, "id")
+    if not include_children:
+        selected = [
+            name for name in selected if name not in ("subtasks", "attachments")
+        ]
+    if fields is None and include_children:
+        return None
+    return selected
+
+
+def todo_ordering(
+    cursor: int | None = None,
+    sort: str | None = Query(
+        None,
+        pattern=f"^-?({'|'.join(SORT_KEYS)})$",
+        description="정렬 기준 (앞에 '-'를 붙이면 내림차순, 예: -due_date)",
+    ),
+):
+    """(cursor, sort). 커서 페이지는 id 순으로만 나눌 수 있다."""
+    if cursor is not None and sort not in (None, "id"):
+        raise HTTPException(
+            status_code=422, detail="Cursor pagination requires id ordering"
+        )
+    return cursor, sort
 
 
 # To-Do 목록 조회
+# 조건(status, priority, due_before, due_after, has_attachments)이나 sort가 있으면
+# 저장소 인덱스로 걸러 반환한다 (기본 정렬은 id 순).
+# limit 또는 cursor를 주면 id 순 페이지로 반환하고, 다음 페이지가 있으면
+# X-Next-Cursor 헤더에 다음 요청의 cursor 값을 담는다.
 @app.get("/todos", response_model=list[TodoItem])
-def get_todos():
-    return load_todos()
+@conditional_get
+def get_todos(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    selected: list[str] | None = Depends(select_fields),
+    ordering: tuple[int | None, str | None] = Depends(todo_ordering),
+    status: list[TodoStatus] = Query([]),
+    priority: list[Priority] = Query([]),
+    due_before: datetime.date | None = Query(
+        None, description="마감일이 이 날짜보다 이른 항목"
+    ),
+    due_after: datetime.date | None = Query(
+        None, description="마감일이 이 날짜보다 늦은 항목"
+    ),
+    has_attachments: bool | None = None,
+):
+    cursor, sort = ordering
+    filtered = (
+        status or priority or due_before or due_after or has_attachments is not None
+    )
+    paged = limit is not None or cursor is not None
+    if paged and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    next_cursor = None
+    if not filtered and sort is None:
+        if paged:
+            todos, next_cursor = store.page(cursor, limit)
+        else:
+            todos = store.all()
+    else:
+        todos = store.query(
+            status=status,
+            priority=priority,
+            due_after=due_after,
+            due_before=due_before,
+            has_attachments=has_attachments,
+            sort=sort or "id",
+        )
+        if cursor is not None:
+            todos = todos[
+                bisect.bisect_right(todos, cursor, key=lambda todo: todo.id) :
+            ]
+        if paged and len(todos) > limit:
+            todos = todos[:limit]
+            if sort in (None, "id"):
+                next_cursor = todos[-1].id
+    response = json_response([todo.to_dict(selected) for todo in todos])
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response
 
 
 # 신규 To-Do 항목 추가
 @app.post("/todos", response_model=TodoItem)
 def create_todo(todo: TodoItem):
-    todos = load_todos()
-    todos.append(todo.model_dump(mode="json"))
-    save_todos(todos)
+    try:
+        store.create(todo.model_dump(mode="json"))
+    except TodoAlreadyExists:
+        raise HTTPException(status_code=409, detail="To-Do item already exists")
     return todo
 
 
+def bulk_results(todo_ids, errors):
+    """저장소 일괄 처리 결과(항목별 None 또는 예외)를 항목별 상태 코드로 바꾼다."""
+    results = []
+    for todo_id, error in zip(todo_ids, errors):
+        if error is None:
+            results.append({"id": todo_id, "status_code": 200})
+        elif isinstance(error, TodoAlreadyExists):
+            results.append(
+                {
+                    "id": todo_id,
+                    "status_code": 409,
+                    "detail": "To-Do item already exists",
+                }
+            )
+        else:
+            results.append(
+                {"id": todo_id, "status_code": 404, "detail": "To-Do item not found"}
+            )
+    return {"results": results}
+
+
+def check_bulk_size(items):
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=422, detail=f"Bulk requests are limited to {MAX_BULK_ITEMS}"
+        )
+
+
+# 일괄 추가/수정/삭제
+# 처리 가능한 항목은 한 번에 적용되어 한 번의 기록으로 저장되고,
+# 응답에는 입력 순서대로 항목별 결과가 담긴다.
+# (/todos/{todo_id} 경로보다 먼저 등록해야 "bulk"가 id로 해석되지 않는다)
+@app.post("/todos/bulk")
+def create_todos_bulk(todos: list[TodoItem]):
+    check_bulk_size(todos)
+    errors = store.create_many([todo.model_dump(mode="json") for todo in todos])
+    return bulk_results([todo.id for todo in todos], errors)
+
+
+@app.patch("/todos/bulk")
+def update_todos_bulk(update: TodoBulkUpdate):
+    check_bulk_size(update.ids)
+    fields = update.fields.model_dump(mode="json", exclude_unset=True)
+    return bulk_results(update.ids, store.update_many(update.ids, fields))
+
+
+@app.delete("/todos/bulk")
+def delete_todos_bulk(request: TodoIds):
+    check_bulk_size(request.ids)
+    return bulk_results(request.ids, store.delete_many(request.ids))
+
+
 # To-Do 항목 수정
 @app.put("/todos/{todo_id}", response_model=TodoItem)
 def update_todo(todo_id: int, updated_todo: TodoItem):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            todo.update(updated_todo.model_dump(mode="json", exclude_unset=True))
-            save_todos(todos)
-            return updated_todo
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    if updated_todo.id != todo_id:
+        raise HTTPException(status_code=422, detail="To-Do id cannot be changed")
+    try:
+        store.update(todo_id, updated_todo.model_dump(mode="json", exclude_unset=True))
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    return updated_todo
+
+
+# To-Do 항목 부분 수정 (JSON merge-patch: 보낸 필드만 바뀌고 null은 값을 지운다)
+@app.patch("/todos/{todo_id}", response_model=TodoItem)
+def patch_todo(todo_id: int, patch: TodoPatch):
+    try:
+        todo = store.update(todo_id, patch.model_dump(mode="json", exclude_unset=True))
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    return json_response(todo.to_dict())
 
 
 # To-Do 항목 삭제
 @app.delete("/todos/{todo_id}", response_model=dict)
 def delete_todo(todo_id: int):
-    todos = load_todos()
-    todos = [todo for todo in todos if todo["id"] != todo_id]
-    save_todos(todos)
+    store.delete(todo_id)
     return {"message": "To-Do item deleted"}
 
 
@@ -167,194 +476,361 @@ def read_root():
 
 @app.delete("/reset")
 def reset():
-    save_todos([])
+    store.replace([])
     return {"message": "Reset complete"}
 
 
+# 제목/설명 검색 (n-gram 색인, 관련도 순). 검색어가 비어 있으면 전체 목록
 @app.get("/todos/search", response_model=list[TodoItem])
-def search_todos(query: str = ""):
-    todos = load_todos()
-    results = [todo for todo in todos if query.lower() in todo["title"].lower()]
-    return results
+def search_todos(query: str = "", limit: int | None = Query(None, ge=1)):
+    if query.strip():
+        todos = store.search(query, limit)
+    else:
+        todos = store.all()[:limit]
+    return json_response([todo.to_dict() for todo in todos])
+
+
+# 변경 분 동기화
+# since 이후 바뀐 항목(현재 상태)과 삭제된 항목/하위 작업/첨부 파일 id를 반환한다.
+# 응답의 version을 다음 요청의 since로 쓴다. since가 없거나, 다른 프로세스의 값이거나,
+# 보존 범위(최근 변경 기록)를 벗어났으면 resync=true와 함께 전체 목록을 반환한다.
+@app.get("/todos/changes")
+def get_changes(since: str | None = None):
+    version = None
+    if since is not None:
+        instance, _, value = since.partition("-")
+        if not value.isdigit():
+            raise HTTPException(status_code=422, detail="Invalid since version")
+        if instance == ETAG_INSTANCE:
+            version = int(value)
+
+    current, changes = store.changes(version) if version is not None else (None, None)
+    if changes is None:
+        # 버전을 먼저 읽어, 그 사이의 변경은 다음 동기화에서 한 번 더 받게 한다
+        current = store.version()
+        content = {
+            "version": f"{ETAG_INSTANCE}-{current}",
+            "resync": True,
+            "todos": [todo.to_dict() for todo in store.all()],
+            "deleted": [],
+            "deleted_subtasks": [],
+            "deleted_attachments": [],
+        }
+    else:
+        content = {
+            "version": f"{ETAG_INSTANCE}-{current}",
+            "resync": False,
+            "todos": [todo.to_dict() for todo in changes["todos"]],
+            "deleted": changes["deleted"],
+            "deleted_subtasks": [
+                {"todo_id": todo_id, "id": child_id}
+                for todo_id, child_id in changes["deleted_subtasks"]
+            ],
+            "deleted_attachments": [
+                {"todo_id": todo_id, "id": child_id}
+                for todo_id, child_id in changes["deleted_attachments"]
+            ],
+        }
+    return json_response(content)
+
+
+def format_event(event):
+    # 버전이 있는 이벤트만 id를 달아, 재연결 시 Last-Event-ID가 마지막 변경을 가리키게 한다
+    lines = [f"event: {event['type']}"]
+    if "version" in event:
+        lines.append(f"id: {event['version']}")
+    lines.append(f"data: {to_json(event).decode()}")
+    return "\n".join(lines) + "\n\n"
+
+
+def current_stats():
+    stats = store.stats()
+    completed = stats["by_status"].get("완료", 0)
+    return {
+        "type": "stats",
+        "total": stats["total"],
+        "completed": completed,
+        "not_completed": stats["total"] - completed,
+        "by_status": stats["by_status"],
+        "by_priority": stats["by_priority"],
+    }
+
+
+# 변경 이벤트 스트림 (Server-Sent Events)
+# upsert(바뀐 항목), delete(삭제된 id), resync(전체를 다시 읽어야 함) 이벤트를 보내고,
+# 변경이 있을 때마다 이어서 stats(집계) 이벤트를 한 번 보낸다.
+# 느린 구독자의 큐가 넘치면 쌓인 이벤트 대신 resync 하나만 받는다.
+@app.get("/events")
+async def stream_events(request: Request):
+    async def stream():
+        subscriber = events.subscribe()
+        try:
+            yield format_event(await run_in_threadpool(current_stats))
+            idle = 0.0
+            while True:
+                batch = await subscriber.get(EVENT_POLL_INTERVAL)
+                if not batch:
+                    if await request.is_disconnected():
+                        break
+                    # 다른 워커의 변경이 있으면 반영되면서 큐에 이벤트가 들어온다
+                    await run_in_threadpool(store.version)
+                    idle += EVENT_POLL_INTERVAL
+                    if idle >= EVENT_HEARTBEAT_INTERVAL:
+                        idle = 0.0
+                        yield ": ping\n\n"
+                    continue
+                idle = 0.0
+                for event in batch:
+                    yield format_event(event)
+                yield format_event(await run_in_threadpool(current_stats))
+        finally:
+            events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # nginx가 응답을 모아 두지 않고 바로 전달하도록 한다
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/todos/stats")
+@conditional_get
 def todo_stats():
-    todos = load_todos()
-    completed = [t for t in todos if t["status"] == "완료"]
-    not_completed = [t for t in todos if t["status"] != "완료"]
+    stats = current_stats()
     return {
-        "total": len(todos),
-        "completed": len(completed),
-        "not_completed": len(not_completed),
+        "total": stats["total"],
+        "completed": stats["completed"],
+        "not_completed": stats["not_completed"],
     }
 
 
 @app.get("/todos/priority/{priority}", response_model=list[TodoItem])
 def get_todos_by_priority(priority: Priority):
-    todos = load_todos()
-    results = [todo for todo in todos if todo.get("priority") == priority.value]
-    return results
+    todos = store.query(priority=[priority], sort=None)
+    return json_response([todo.to_dict() for todo in todos])
 
 
 @app.get("/todos/{todo_id}/subtasks", response_model=list[SubTask])
 def get_subtasks(todo_id: int):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            return todo.get("subtasks", [])
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    todo = store.get(todo_id)
+    if todo is None:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    return json_response(todo.subtasks)
 
 
 @app.post("/todos/{todo_id}/subtasks", response_model=SubTask)
 def add_subtask(todo_id: int, subtask: SubTask):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            if "subtasks" not in todo:
-                todo["subtasks"] = []
-
-            todo["subtasks"].append(subtask.model_dump(mode="json"))
-            save_todos(todos)
-            return subtask
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    try:
+        store.add_subtask(todo_id, subtask.model_dump(mode="json"))
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    return subtask
 
 
 @app.put("/todos/{todo_id}/subtasks/{subtask_id}", response_model=SubTask)
 def update_subtask(todo_id: int, subtask_id: int, updated_subtask: SubTask):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id and "subtasks" in todo:
-            for i, subtask in enumerate(todo["subtasks"]):
-                if subtask["id"] == subtask_id:
-                    updated_data = updated_subtask.model_dump(mode="json")
-                    updated_data["id"] = subtask_id
-
-                    todo["subtasks"][i] = updated_data
-                    save_todos(todos)
-                    return updated_subtask
-
-            raise HTTPException(status_code=404, detail="Subtask not found")
-
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    try:
+        store.update_subtask(
+            todo_id, subtask_id, updated_subtask.model_dump(mode="json")
+        )
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    except SubtaskNotFound:
+        raise HTTPException(status_code=404, detail="Subtask not found")
+    return updated_subtask
+
+
+@app.patch("/todos/{todo_id}/subtasks/{subtask_id}", response_model=SubTask)
+def patch_subtask(todo_id: int, subtask_id: int, patch: SubTaskPatch):
+    try:
+        subtask = store.patch_subtask(
+            todo_id, subtask_id, patch.model_dump(mode="json", exclude_unset=True)
+        )
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    except SubtaskNotFound:
+        raise HTTPException(status_code=404, detail="Subtask not found")
+    return json_response(subtask)
 
 
 @app.delete("/todos/{todo_id}/subtasks/{subtask_id}", response_model=dict)
 def delete_subtask(todo_id: int, subtask_id: int):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id and "subtasks" in todo:
-            original_length = len(todo["subtasks"])
-            todo["subtasks"] = [st for st in todo["subtasks"] if st["id"] != subtask_id]
+    try:
+        store.delete_subtask(todo_id, subtask_id)
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    except SubtaskNotFound:
+        raise HTTPException(status_code=404, detail="Subtask not found")
+    return {"message": "Subtask deleted"}
+
+
+# 요청 본문을 스트리밍으로 받으므로 multipart 스키마는 OpenAPI에 직접 적는다
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
 
-            if len(todo["subtasks"]) < original_length:
-                save_todos(todos)
-                return {"message": "Subtask deleted"}
 
-            raise HTTPException(status_code=404, detail="Subtask not found")
+# 파일은 받는 대로 업로드 디렉터리의 임시 파일에 기록되고(이벤트 루프 밖),
+# 다 받은 뒤 고유한 이름으로 옮겨진다. MAX_UPLOAD_BYTES를 넘으면 413.
+@app.post(
+    "/todos/{todo_id}/attachments",
+    response_model=Attachment,
+    openapi_extra=UPLOAD_OPENAPI,
+)
+async def upload_attachment(todo_id: int, request: Request):
+    if await run_in_threadpool(store.get, todo_id) is None:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
 
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    try:
+        upload = await receive_upload(
+            request.headers, request.stream(), UPLOAD_DIRECTORY, MAX_UPLOAD_BYTES
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes"
+        )
+    except InvalidUpload as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    # 같은 내용의 파일은 한 번만 저장된다 (파일 이름은 내용의 SHA-256 + 확장자)
+    # put이 실패하면 임시 파일은 put 안에서 정리된다
+    filename = await run_in_threadpool(blobs.put, upload)
+    try:
+        attachment_info = Attachment(
+            id=str(uuid.uuid4()),  # 첨부 파일 자체의 고유 ID
+            filename=filename,
+            original_filename=upload.filename,
+            file_type=upload.content_type,
+            size=upload.size,
+            sha256=upload.sha256,
+        )
+        await run_in_threadpool(
+            store.add_attachment, todo_id, attachment_info.model_dump(mode="json")
+        )
+    except TodoNotFound:
+        # 업로드 도중 To-Do 항목이 삭제된 경우
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    finally:
+        await run_in_threadpool(blobs.release, filename, upload)
+    return attachment_info
 
 
-@app.post("/todos/{todo_id}/attachments", response_model=Attachment)
-async def upload_attachment(todo_id: int, file: UploadFile = File(...)):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            # 고유한 파일 이름 생성 (UUID 사용)
-            file_extension = os.path.splitext(file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(UPLOAD_DIRECTORY, unique_filename)
-
-            # 파일 저장
-            try:
-                with open(file_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-            except Exception:
-                raise HTTPException(status_code=500, detail="Failed to upload file")
-            finally:
-                file.file.close()
-
-            # To-Do Item에 첨부 파일 정보 추가
-            attachment_info = Attachment(
-                id=str(uuid.uuid4()),  # 첨부 파일 자체의 고유 ID
-                filename=unique_filename,
-                original_filename=file.filename,
-                file_type=file.content_type,
-            )
-            if "attachments" not in todo:
-                todo["attachments"] = []
-            todo["attachments"].append(attachment_info.model_dump(mode="json"))
-            save_todos(todos)
-            return attachment_info
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+# 첨부 파일 저장 공간 사용량
+@app.get("/attachments/usage")
+def attachment_usage():
+    return blobs.usage()
 
 
 @app.get("/todos/{todo_id}/attachments", response_model=list[Attachment])
 def get_attachments(todo_id: int):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            return todo.get("attachments", [])
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    todo = store.get(todo_id)
+    if todo is None:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    return json_response(todo.attachments)
+
+
+def content_disposition(filename):
+    # FileResponse와 같은 형식 (ASCII가 아니면 RFC 5987 filename*)
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since
+
+
+# 첨부 파일 다운로드
+# 첨부 파일의 내용은 바뀌지 않으므로 내용 해시를 ETag로 쓰고, If-None-Match/
+# If-Modified-Since가 맞으면 304를 반환한다. Range 요청(206)은 FileResponse가 처리한다.
+# ATTACHMENT_ACCEL_PREFIX가 설정되어 있으면 파일을 직접 보내지 않고
+# X-Accel-Redirect로 nginx에 넘긴다 (nginx/default.conf의 internal location).
+@app.get("/todos/{todo_id}/attachments/{attachment_id}/download")
+def download_attachment(todo_id: int, attachment_id: str, request: Request):
+    try:
+        attachment = store.get_attachment(todo_id, attachment_id)
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    except AttachmentNotFound:
+        raise HTTPException(
+            status_code=404, detail="Attachment not found in To-Do item"
+        )
 
+    file_path = os.path.join(UPLOAD_DIRECTORY, attachment["filename"])
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404, detail="Attachment file not found on server"
+        )
 
-@app.get("/todos/{todo_id}/attachments/{attachment_id}/download")
-async def download_attachment(todo_id: int, attachment_id: str):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id:
-            for attachment in todo.get("attachments", []):
-                if attachment["id"] == attachment_id:
-                    file_path = os.path.join(UPLOAD_DIRECTORY, attachment["filename"])
-                    if os.path.exists(file_path):
-                        return FileResponse(
-                            path=file_path,
-                            filename=attachment["original_filename"],
-                            media_type=attachment["file_type"],
-                        )
-                    raise HTTPException(
-                        status_code=404, detail="Attachment file not found on server"
-                    )
-            raise HTTPException(
-                status_code=404, detail="Attachment not found in To-Do item"
-            )
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    # 이전에 올린 파일은 해시가 없지만 파일 이름(UUID)이 내용마다 고유하다
+    etag = f'"{attachment.get("sha256") or attachment["filename"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    if ATTACHMENT_ACCEL_PREFIX:
+        headers["X-Accel-Redirect"] = ATTACHMENT_ACCEL_PREFIX + attachment["filename"]
+        headers["Content-Disposition"] = content_disposition(
+            attachment["original_filename"]
+        )
+        return Response(headers=headers, media_type=attachment["file_type"])
+    return FileResponse(
+        path=file_path,
+        filename=attachment["original_filename"],
+        media_type=attachment["file_type"],
+        headers=headers,
+        stat_result=stat_result,
+    )
 
 
 @app.delete("/todos/{todo_id}/attachments/{attachment_id}", response_model=dict)
 def delete_attachment(todo_id: int, attachment_id: str):
-    todos = load_todos()
-    for todo in todos:
-        if todo["id"] == todo_id and "attachments" in todo:
-            attachment_to_delete = None
-            for att in todo["attachments"]:
-                if att["id"] == attachment_id:
-                    attachment_to_delete = att
-                    break
-
-            if attachment_to_delete:
-                todo["attachments"] = [
-                    att for att in todo["attachments"] if att["id"] != attachment_id
-                ]
-                file_path = os.path.join(
-                    UPLOAD_DIRECTORY, attachment_to_delete["filename"]
-                )
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                save_todos(todos)
-                return {"message": "Attachment deleted successfully"}
-
-            raise HTTPException(status_code=404, detail="Attachment not found")
-
-    raise HTTPException(status_code=404, detail="To-Do item not found")
+    try:
+        attachment = store.delete_attachment(todo_id, attachment_id)
+    except TodoNotFound:
+        raise HTTPException(status_code=404, detail="To-Do item not found")
+    except AttachmentNotFound:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    # 다른 항목이 같은 파일을 참조하지 않을 때만 지워진다
+    blobs.collect([attachment["filename"]])
+    return {"message": "Attachment deleted successfully"}
 
 
 # 전체 대시보드 데이터
 @app.get("/dashboard")
+@conditional_get
 def get_dashboard():
-    todos = load_todos()
-    total = len(todos)
+    return result_cache.get("dashboard", (), build_dashboard)
+
+
+def build_dashboard():
+    stats = store.stats()
+    total = stats["total"]
 
     if total == 0:
         return {
@@ -373,30 +849,24 @@ def get_dashboard():
         }
 
     # 상태별 통계
-    status_counts = Counter(todo["status"] for todo in todos)
+    status_counts = stats["by_status"]
     completed = status_counts.get("완료", 0)
     in_progress = status_counts.get("진행 중", 0)
     not_started = status_counts.get("시작 전", 0)
 
     # 우선순위별 통계
-    priority_counts = Counter(
-        todo.get("priority") for todo in todos if todo.get("priority")
-    )
+    priority_counts = stats["by_priority"]
 
-    # 마감임박/연체 할일
+    # 마감임박/연체 할일 (마감일 인덱스에서 구간만 조회)
     today = datetime.datetime.now().date()
-    due_soon = []
-    overdue = []
-
-    for todo in todos:
-        if todo.get("due_date") and todo["status"] != "완료":
-            due_date = datetime.datetime.strptime(todo["due_date"], "%Y-%m-%d").date()
-            days_diff = (due_date - today).days
-
-            if days_diff < 0:  # 연체
-                overdue.append({**todo, "days_overdue": abs(days_diff)})
-            elif days_diff <= 3:  # 3일 이내 마감
-                due_soon.append({**todo, "days_left": days_diff})
+    overdue = [
+        {**todo.to_dict(), "days_overdue": (today - due_date).days}
+        for due_date, todo in store.open_due_between(end=today - ONE_DAY)
+    ]
+    due_soon = [  # 3일 이내 마감
+        {**todo.to_dict(), "days_left": (due_date - today).days}
+        for due_date, todo in store.open_due_between(today, today + 3 * ONE_DAY)
+    ]
 
     return {
         "summary": {
@@ -415,46 +885,54 @@ def get_dashboard():
             {"status": "진행 중", "count": in_progress},
             {"status": "시작 전", "count": not_started},
         ],
-        "due_soon": sorted(due_soon, key=lambda x: x["days_left"]),
-        "overdue": sorted(overdue, key=lambda x: x["days_overdue"], reverse=True),
-        "recent_activity": get_recent_todos(todos, 5),
+        "due_soon": due_soon,
+        "overdue": overdue,
+        "recent_activity": get_recent_todos(5),
     }
 
 
-# 완료율 추이 (최근 30일)
+def trend_range(
+    days: int = Query(30, ge=1, le=MAX_TREND_DAYS),
+    from_date: datetime.date | None = Query(None, alias="from"),
+    to_date: datetime.date | None = Query(None, alias="to"),
+):
+    """(시작일, 종료일). to가 없으면 오늘, from이 없으면 종료일까지 days일이다."""
+    end = to_date or datetime.datetime.now().date()
+    start = from_date or end - datetime.timedelta(days=days - 1)
+    if start > end:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+    if (end - start).days >= MAX_TREND_DAYS:
+        raise HTTPException(
+            status_code=422, detail=f"Trend range is limited to {MAX_TREND_DAYS} days"
+        )
+    return start, end
+
+
+# 완료율 추이 (기본 최근 30일)
 @app.get("/dashboard/completion-trend")
-def get_completion_trend():
-    todos = load_todos()
-    today = datetime.datetime.now().date()
-    trend_data = []
+@conditional_get
+def get_completion_trend(
+    date_range: tuple[datetime.date, datetime.date] = Depends(trend_range),
+):
+    # 해당 날짜까지 마감인 할일들의 누적 완료율
+    # (실제로는 created_date 필드가 필요하지만, 임시로 due_date 사용)
+    start, end = date_range
+    return result_cache.get(
+        "completion-trend", (start, end), lambda: build_completion_trend(start, end)
+    )
+
 
-    for i in range(29, -1, -1):  # 최근 30일
-        date = today - datetime.timedelta(days=i)
-        date_str = date.strftime("%Y-%m-%d")
-
-        # 해당 날짜까지의 누적 완료율 계산
-        total_by_date = 0
-        completed_by_date = 0
-
-        for todo in todos:
-            # 생성일이 해당 날짜 이전인 할일들만 포함
-            # (실제로는 created_date 필드가 필요하지만, 임시로 due_date 사용)
-            if todo.get("due_date"):
-                todo_date = datetime.datetime.strptime(
-                    todo["due_date"], "%Y-%m-%d"
-                ).date()
-                if todo_date <= date:
-                    total_by_date += 1
-                    if todo["status"] == "완료":
-                        completed_by_date += 1
+def build_completion_trend(start, end):
 
+    trend_data = []
+    for date, total_by_date, completed_by_date in store.completion_trend(start, end):
         completion_rate = (
             (completed_by_date / total_by_date * 100) if total_by_date > 0 else 0
         )
 
         trend_data.append(
             {
-                "date": date_str,
+                "date": date.strftime("%Y-%m-%d"),
                 "total": total_by_date,
                 "completed": completed_by_date,
                 "completion_rate": round(completion_rate, 1),
@@ -466,18 +944,21 @@ def get_completion_trend():
 
 # 우선순위별 완료율
 @app.get("/dashboard/priority-completion")
+@conditional_get
 def get_priority_completion():
-    todos = load_todos()
+    return result_cache.get("priority-completion", (), build_priority_completion)
+
+
+def build_priority_completion():
     priority_stats = {}
 
-    for todo in todos:
-        priority = todo.get("priority", "없음")
+    for (priority, status), count in store.stats()["by_priority_status"].items():
         if priority not in priority_stats:
             priority_stats[priority] = {"total": 0, "completed": 0}
 
-        priority_stats[priority]["total"] += 1
-        if todo["status"] == "완료":
-            priority_stats[priority]["completed"] += 1
+        priority_stats[priority]["total"] += count
+        if status == "완료":
+            priority_stats[priority]["completed"] += count
 
     result = []
     for priority, stats in priority_stats.items():
@@ -498,38 +979,39 @@ def get_priority_completion():
 
 # 월별 생산성 통계
 @app.get("/dashboard/monthly-stats")
+@conditional_get
 def get_monthly_stats():
-    todos = load_todos()
+    return result_cache.get("monthly-stats", (), build_monthly_stats)
+
+
+def build_monthly_stats():
+    todos = store.all()
     monthly_stats = {}
 
     for todo in todos:
-        if todo.get("due_date"):
-            try:
-                month = datetime.datetime.strptime(
-                    todo["due_date"], "%Y-%m-%d"
-                ).strftime("%Y-%m")
-                if month not in monthly_stats:
-                    monthly_stats[month] = {
-                        "total": 0,
-                        "completed": 0,
-                        "high_priority": 0,
-                        "high_priority_completed": 0,
-                    }
-
-                monthly_stats[month]["total"] += 1
-                if todo["status"] == "완료":
-                    monthly_stats[month]["completed"] += 1
-
-                if todo.get("priority") == "높음":
-                    monthly_stats[month]["high_priority"] += 1
-                    if todo["status"] == "완료":
-                        monthly_stats[month]["high_priority_completed"] += 1
-
-            except ValueError:
-                continue
+        if todo.due_date is None:
+            continue
+        month = (todo.due_date.year, todo.due_date.month)
+        if month not in monthly_stats:
+            monthly_stats[month] = {
+                "total": 0,
+                "completed": 0,
+                "high_priority": 0,
+                "high_priority_completed": 0,
+            }
+
+        completed = todo.status is TodoStatus.completed
+        monthly_stats[month]["total"] += 1
+        if completed:
+            monthly_stats[month]["completed"] += 1
+
+        if todo.priority is Priority.high:
+            monthly_stats[month]["high_priority"] += 1
+            if completed:
+                monthly_stats[month]["high_priority_completed"] += 1
 
     result = []
-    for month, stats in sorted(monthly_stats.items()):
+    for (year, month), stats in sorted(monthly_stats.items()):
         completion_rate = (
             (stats["completed"] / stats["total"] * 100) if stats["total"] > 0 else 0
         )
@@ -541,7 +1023,7 @@ def get_monthly_stats():
 
         result.append(
             {
-                "month": month,
+                "month": f"{year:04d}-{month:02d}",
                 "total": stats["total"],
                 "completed": stats["completed"],
                 "completion_rate": round(completion_rate, 1),
@@ -554,46 +1036,107 @@ def get_monthly_stats():
 
 # 마감일 알림 (오늘, 내일, 이번주)
 @app.get("/dashboard/due-alerts")
+@conditional_get
 def get_due_alerts():
-    todos = load_todos()
+    return result_cache.get("due-alerts", (), build_due_alerts)
+
+
+def build_due_alerts():
     today = datetime.datetime.now().date()
 
     alerts = {"today": [], "tomorrow": [], "this_week": [], "overdue": []}
 
-    for todo in todos:
-        if todo.get("due_date") and todo["status"] != "완료":
-            due_date = datetime.datetime.strptime(todo["due_date"], "%Y-%m-%d").date()
-            days_diff = (due_date - today).days
-
-            if days_diff < 0:
-                alerts["overdue"].append({**todo, "days_overdue": abs(days_diff)})
-            elif days_diff == 0:
-                alerts["today"].append(todo)
-            elif days_diff == 1:
-                alerts["tomorrow"].append(todo)
-            elif days_diff <= 7:
-                alerts["this_week"].append({**todo, "days_left": days_diff})
+    for due_date, record in store.open_due_between(end=today + 7 * ONE_DAY):
+        days_diff = (due_date - today).days
+        todo = record.to_dict()
+
+        if days_diff < 0:
+            alerts["overdue"].append({**todo, "days_overdue": abs(days_diff)})
+        elif days_diff == 0:
+            alerts["today"].append(todo)
+        elif days_diff == 1:
+            alerts["tomorrow"].append(todo)
+        else:
+            alerts["this_week"].append({**todo, "days_left": days_diff})
 
     return alerts
 
 
 # 헬퍼 함수
-def get_recent_todos(todos, limit=5):
+def get_recent_todos(limit=5):
     """최근 할일들 반환 (due_date 기준으로 정렬)"""
-    recent = []
-    for todo in todos:
-        if todo.get("due_date"):
-            try:
-                due_date = datetime.datetime.strptime(todo["due_date"], "%Y-%m-%d")
-                recent.append({**todo, "due_date_obj": due_date})
-            except ValueError:
-                continue
+    return [todo.to_dict() for todo in store.latest_due(limit)]
+
+
+# 프로파일링
+# GET /debug/profile?seconds=N: 이 워커의 모든 스레드 스택을 N초 동안 채집해
+# collapsed 형식(flamegraph.pl, speedscope 등에서 열 수 있음)으로 반환한다.
+# 요청에 X-Profile: <토큰> 헤더를 붙이면 그 요청을 처리하는 동안만 채집하고,
+# 응답의 X-Profile-Id로 GET /debug/profiles/{id}에서 결과를 받는다.
+# 인증은 Authorization: Bearer <토큰>. 토큰이 없으면 경로와 미들웨어 모두 꺼져 있다.
+profiler = Profiler(PROFILER_TOKEN)
+
+
+def require_profiler(authorization: str | None = Header(None)):
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not profiler.authorized(token):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid profiler token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 
-    # due_date 기준으로 정렬하고 상위 n개만 반환
-    recent.sort(key=lambda x: x["due_date_obj"], reverse=True)
+def collapsed_response(counts, name):
+    return Response(
+        content=format_collapsed(counts),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{name}.collapsed"'},
+    )
+
+
+@app.get(
+    "/debug/profile",
+    dependencies=[Depends(require_profiler)],
+    include_in_schema=False,
+)
+def profile_worker(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    # 채집이 끝나기를 기다리기만 하는 이 스레드는 결과에서 뺀다
+    sampler = profiler.begin(interval_ms / 1000, ignore=[threading.get_ident()])
+    if sampler is None:
+        raise HTTPException(status_code=409, detail="Profiler is already running")
+    try:
+        time.sleep(seconds)
+    finally:
+        counts = profiler.end(sampler)
+    return collapsed_response(counts, "profile")
+
+
+@app.get(
+    "/debug/profiles/{profile_id}",
+    dependencies=[Depends(require_profiler)],
+    include_in_schema=False,
+)
+def get_request_profile(profile_id: str):
+    counts = profiler.get(profile_id)
+    if counts is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return collapsed_response(counts, f"profile-{profile_id}")
 
-    # due_date_obj 제거하고 반환
-    for item in recent[:limit]:
-        del item["due_date_obj"]
 
-    return recent[:limit]
+if PROFILER_TOKEN:
+    app.add_middleware(ProfileRequestMiddleware, profiler=profiler)
+
+
+# 접근 로그는 가장 바깥 미들웨어로 등록해 다른 미들웨어가 바로 응답한 요청(304 등)도 기록한다
+app.add_middleware(
+    AccessLogMiddleware,
+    sink=access_log_sink,
+    sample_rate=float(getenv("TODO_ACCESS_LOG_SAMPLE_RATE", "1.0")),
+    slow_seconds=float(getenv("TODO_ACCESS_LOG_SLOW_MS", "500")) / 1000,
+)
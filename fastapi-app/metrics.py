@@ -0,0 +1,50 @@
+"""처리 단계별 시간과 데이터 크기 메트릭."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Gauge, Histogram
+
+STAGE_SECONDS = Histogram(
+    "todo_stage_duration_seconds",
+    "Time spent in each processing stage",
+    ["stage", "route"],
+    buckets=(
+        0.0001,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+    ),
+)
+
+TODO_ITEMS = Gauge("todo_items", "Number of todo items")
+DATA_FILE_BYTES = Gauge(
+    "todo_data_file_bytes", "Bytes used by the todo data files (snapshot, log, db)"
+)
+
+# 처리 중인 요청의 라우트 템플릿 (/todos/{todo_id}).
+# 요청 밖(시작 시 로드, 백그라운드 기록/flush 스레드)에서는 "background"다.
+current_route = ContextVar("current_route", default="background")
+
+
+@contextmanager
+def timed(stage):
+    """블록 실행 시간을 현재 라우트의 stage 단계 시간으로 기록한다."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage, current_route.get()).observe(
+            time.perf_counter() - started
+        )
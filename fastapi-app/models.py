@@ -0,0 +1,200 @@
+from pydantic import BaseModel, ConfigDict, model_validator
+from enum import Enum
+import datetime
+
+
+class TodoStatus(str, Enum):
+    not_started = "시작 전"
+    in_progress = "진행 중"
+    completed = "완료"
+
+
+class Priority(str, Enum):
+    high = "높음"
+    medium = "중간"
+    low = "낮음"
+
+
+class SubTask(BaseModel):
+    id: int
+    title: str
+    completed: bool = False
+
+
+class Attachment(BaseModel):
+    id: str
+    filename: str
+    original_filename: str
+    file_type: str
+    # 업로드 시 기록한 크기(바이트)와 SHA-256. 이전에 올린 파일은 없을 수 있다
+    size: int | None = None
+    sha256: str | None = None
+
+
+# To-Do 항목 모델
+class TodoItem(BaseModel):
+    id: int
+    title: str
+    description: str
+    due_date: datetime.date | None
+    status: TodoStatus = TodoStatus.not_started
+    priority: Priority | None = None
+    subtasks: list[SubTask] = []
+    attachments: list[Attachment] = []
+
+
+class TodoPatch(BaseModel):
+    """To-Do 항목 부분 수정. 보낸 필드만 바뀌며, null은 값을 지운다."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    title: str | None = None
+    description: str | None = None
+    due_date: datetime.date | None = None
+    status: TodoStatus | None = None
+    priority: Priority | None = None
+    subtasks: list[SubTask] | None = None
+    attachments: list[Attachment] | None = None
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        # TodoItem에서 None을 허용하는 필드만 지울 수 있다
+        return _reject_nulls(self, nullable={"due_date", "priority"})
+
+
+class SubTaskPatch(BaseModel):
+    """하위 작업 부분 수정. 보낸 필드만 바뀐다."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    title: str | None = None
+    completed: bool | None = None
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        return _reject_nulls(self)
+
+
+def _reject_nulls(patch, nullable=frozenset()):
+    for name in patch.model_fields_set - nullable:
+        if getattr(patch, name) is None:
+            raise ValueError(f"{name} cannot be null")
+    return patch
+
+
+class TodoBulkUpdate(BaseModel):
+    ids: list[int]
+    fields: TodoPatch
+
+
+class TodoIds(BaseModel):
+    ids: list[int]
+
+
+class TodoRecord:
+    """저장소 내부에서 쓰는 To-Do 항목 표현.
+
+    수집 시 TodoItem으로 한 번만 검증하고, due_date는 date로,
+    status/priority는 Enum 멤버(싱글턴)로 보관한다.
+    하위 작업/첨부 파일은 JSON 형태 dict의 tuple이다.
+    생성 후에는 바꾸지 않으며, 변경은 replace()로 새 레코드를 만든다.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "due_date",
+        "status",
+        "priority",
+        "subtasks",
+        "attachments",
+    )
+
+    def __init__(
+        self,
+        id,
+        title,
+        description,
+        due_date,
+        status,
+        priority,
+        subtasks=(),
+        attachments=(),
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.due_date = due_date
+        self.status = status
+        self.priority = priority
+        self.subtasks = subtasks
+        self.attachments = attachments
+
+    @classmethod
+    def from_dict(cls, data):
+        item = TodoItem.model_validate(data)
+        return cls(
+            item.id,
+            item.title,
+            item.description,
+            item.due_date,
+            item.status,
+            item.priority,
+            tuple(subtask.model_dump() for subtask in item.subtasks),
+            tuple(attachment.model_dump() for attachment in item.attachments),
+        )
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return TodoRecord(**values)
+
+    def merge(self, fields):
+        """fields(JSON 형태 일부 필드)를 덮어쓴 새 레코드.
+
+        바뀐 필드만 검증하고, 주어지지 않은 하위 목록은 같은 tuple을 그대로 쓴다.
+        id는 바꿀 수 없으므로 fields에 있어도 무시한다.
+        """
+        record = TodoRecord.from_dict(
+            {
+                "title": self.title,
+                "description": self.description,
+                "due_date": self.due_date,
+                "status": self.status,
+                "priority": self.priority,
+                **fields,
+                "id": self.id,
+            }
+        )
+        if "subtasks" not in fields:
+            record.subtasks = self.subtasks
+        if "attachments" not in fields:
+            record.attachments = self.attachments
+        return record
+
+    def to_dict(self, fields=None):
+        """JSON 형태 dict. fields가 주어지면 그 필드만 순서대로 담는다."""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "status": self.status.value,
+            "priority": self.priority.value if self.priority else None,
+            "subtasks": list(self.subtasks),
+            "attachments": list(self.attachments),
+        }
+        if fields is None:
+            return data
+        return {name: data[name] for name in fields}
+
+    def __eq__(self, other):
+        if not isinstance(other, TodoRecord):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return f"TodoRecord(id={self.id!r}, title={self.title!r})"
@@ -0,0 +1,177 @@
+"""요청 처리 중인 워커의 스택 샘플링 프로파일러.
+
+외부 도구 없이 sys._current_frames()로 일정 간격마다 모든 스레드의 스택을 채집하고,
+flamegraph.pl / speedscope 등에서 바로 열 수 있는 collapsed 형식
+("스레드;바깥 함수;...;안쪽 함수 샘플 수")으로 돌려준다.
+채집 중에만 샘플링 스레드가 돌며, 그 외에는 비용이 없다.
+"""
+
+import hmac
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+# 기다리는 중인 스레드의 맨 안쪽 함수. 앱 코드를 거치지 않은 채 여기서 기다리는
+# 스레드(쉬고 있는 이벤트 루프/스레드 풀 등)는 건너뛴다
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+}
+APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+BACKGROUND_THREAD_PREFIX = "todo-"
+
+
+def collapse(frame):
+    """프레임 스택을 바깥 -> 안쪽 순서의 "함수 (파일:줄)" 목록으로 바꾼다."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def is_idle(thread_name, frame):
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) not in IDLE_FRAMES:
+        return False
+    # 앱의 백그라운드 스레드(todo-*)가 다음 일을 기다리는 것은 건너뛰고,
+    # 요청 처리 중 앱 코드에서 기다리는 것(예: 기록 완료 대기)은 처리 시간에 포함한다
+    if thread_name.startswith(BACKGROUND_THREAD_PREFIX):
+        return True
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(APP_DIRECTORY):
+            return False
+        frame = frame.f_back
+    return True
+
+
+def format_collapsed(counts):
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class StackSampler:
+    """interval초마다 다른 모든 스레드의 스택을 채집한다. stop()이 샘플 수를 반환한다.
+
+    ignore는 채집에서 뺄 스레드 ident 목록이다 (예: 채집이 끝나기를 기다리는 스레드).
+    """
+
+    def __init__(self, interval, ignore=()):
+        self.interval = interval
+        self.ignore = set(ignore)
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="todo-profiler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        ignore = {threading.get_ident(), *self.ignore}
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident in ignore or is_idle(name, frame):
+                    continue
+                stack = [name, *collapse(frame)]
+                self.counts[";".join(stack)] += 1
+
+
+class Profiler:
+    """한 번에 하나의 채집만 허용하고, 요청별 결과는 최근 keep개만 보관한다."""
+
+    def __init__(self, token, interval=0.005, keep=16):
+        self.token = token
+        self.interval = interval
+        self.keep = keep
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def authorized(self, token):
+        return bool(self.token) and hmac.compare_digest(
+            token.encode(), self.token.encode()
+        )
+
+    def begin(self, interval=None, ignore=()):
+        """채집을 시작한다. 다른 채집이 진행 중이면 None."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        return StackSampler(interval or self.interval, ignore).start()
+
+    def end(self, sampler):
+        try:
+            return sampler.stop()
+        finally:
+            self._busy.release()
+
+    def save(self, profile_id, counts):
+        with self._lock:
+            self._results[profile_id] = counts
+            while len(self._results) > self.keep:
+                self._results.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._results.get(profile_id)
+
+
+class ProfileRequestMiddleware:
+    """요청 헤더(header)에 올바른 토큰이 있으면 그 요청을 처리하는 동안만 채집한다.
+
+    응답에 X-Profile-Id 헤더를 붙이고, 결과는 profiler.get(id)로 찾을 수 있다.
+    같은 시간에 처리 중인 다른 요청의 스택도 함께 잡힌다.
+    """
+
+    def __init__(self, app, profiler, header="x-profile"):
+        self.app = app
+        self.profiler = profiler
+        self.header = header.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next(
+            (value for name, value in scope["headers"] if name == self.header), None
+        )
+        if token is None or not self.profiler.authorized(token.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+        sampler = self.profiler.begin()
+        if sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            counts = await run_in_threadpool(self.profiler.end, sampler)
+            self.profiler.save(profile_id, counts)
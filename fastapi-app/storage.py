@@ -0,0 +1,1417 @@
+import bisect
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+
+from indexes import (
+    ChangeLog,
+    DueDateHistogram,
+    DueDateIndex,
+    GroupIndex,
+    NgramIndex,
+    SortedIds,
+    TodoCounts,
+)
+from metrics import timed
+from models import Attachment, Priority, SubTask, TodoRecord, TodoStatus
+
+logger = logging.getLogger("todo.storage")
+
+# 쓰기 내구성 정책
+# - always: 변경마다 즉시 디스크에 기록 (fsync 포함)
+# - interval: 변경을 모아 flush_interval 초마다 백그라운드에서 기록
+# - never: 종료(close) 시에만 기록
+DURABILITY_POLICIES = ("always", "interval", "never")
+
+
+class TodoNotFound(LookupError):
+    pass
+
+
+class TodoAlreadyExists(ValueError):
+    pass
+
+
+class SubtaskNotFound(LookupError):
+    pass
+
+
+class AttachmentNotFound(LookupError):
+    pass
+
+
+def write_file_atomic(path, content):
+    """임시 파일에 쓴 뒤 rename 하여 기록 도중 크래시가 나도 파일이 잘리지 않게 한다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_json_file(path):
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            return json.load(file)
+    return []
+
+
+def dump_todos(todos):
+    """TodoRecord 목록을 todo.json 형식 문자열로 만든다."""
+    return json.dumps([todo.to_dict() for todo in todos], indent=4)
+
+
+ONE_DAY = datetime.timedelta(days=1)
+
+# query()의 정렬 기준. 값이 None인 항목은 정렬 방향과 관계없이 맨 뒤에 둔다
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(Priority)}
+_STATUS_RANK = {status: rank for rank, status in enumerate(TodoStatus)}
+SORT_KEYS = {
+    "id": lambda todo: todo.id,
+    "title": lambda todo: todo.title,
+    "due_date": lambda todo: todo.due_date,
+    "priority": lambda todo: _PRIORITY_RANK.get(todo.priority),
+    "status": lambda todo: _STATUS_RANK[todo.status],
+}
+
+
+def _matches(todo, status, priority, due_after, due_before, has_attachments):
+    if status and todo.status not in status:
+        return False
+    if priority and todo.priority not in priority:
+        return False
+    if due_after is not None or due_before is not None:
+        if todo.due_date is None:
+            return False
+        if due_after is not None and todo.due_date <= due_after:
+            return False
+        if due_before is not None and todo.due_date >= due_before:
+            return False
+    if has_attachments is not None and bool(todo.attachments) != has_attachments:
+        return False
+    return True
+
+
+def sort_todos(todos, sort):
+    """sort는 SORT_KEYS의 이름이며, 앞에 '-'가 붙으면 내림차순이다."""
+    descending = sort.startswith("-")
+    key = SORT_KEYS[sort.lstrip("-")]
+    present = [todo for todo in todos if key(todo) is not None]
+    missing = [todo for todo in todos if key(todo) is None]
+    present.sort(key=key, reverse=descending)
+    return present + missing
+
+
+def _put_child(children, child):
+    """같은 id가 있으면 그 자리에서 교체하고, 없으면 끝에 추가한다."""
+    for i, existing in enumerate(children):
+        if existing["id"] == child["id"]:
+            return (*children[:i], child, *children[i + 1 :])
+    return (*children, child)
+
+
+def _remove_child(children, child_id):
+    return tuple(child for child in children if child["id"] != child_id)
+
+
+class _Backend:
+    """durability 정책에 따른 백그라운드 flush를 공통으로 처리한다.
+
+    파일/연결은 백엔드 락(_io_lock)으로 보호되므로 write()/sync()는 저장소 락 없이
+    호출해도 되며, 기록 순서는 호출 순서(GroupCommitter의 큐 순서)를 따른다.
+    두 락을 함께 잡을 때는 항상 저장소 락(open()에서 전달)을 먼저 잡는다.
+    """
+
+    def __init__(self, path, durability="always", flush_interval=1.0):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.path = path
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self._lock = None
+        self._io_lock = threading.Lock()
+        self._snapshot = None
+        self._dirty = False
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def open(self, lock, snapshot):
+        """저장소 락과, 현재 상태의 일관된 복사본을 반환하는 함수를 연결한다."""
+        self._lock = lock
+        self._snapshot = snapshot
+        if self.durability == "interval":
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="todo-store-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.sync()
+            except OSError:
+                logger.exception("Failed to flush todos to %s", self.path)
+
+    def _locked(self):
+        """write()/sync()가 잡는 락. 메모리 상태를 읽는 백엔드는 저장소 락도 잡는다."""
+        return self._io_lock
+
+    def sync(self):
+        with self._locked():
+            if self._dirty:
+                with timed("store_sync"):
+                    self._sync_locked()
+                self._dirty = False
+
+    def data_files(self):
+        """이 백엔드가 데이터를 기록하는 파일 경로 목록."""
+        return [self.path]
+
+    def data_bytes(self):
+        return sum(
+            os.path.getsize(path) for path in self.data_files() if os.path.exists(path)
+        )
+
+    def poll(self):
+        """다른 프로세스가 남긴 변경을 연산 목록으로 반환한다. 파일 백엔드는 없음."""
+        return []
+
+    def instance_id(self):
+        """여러 프로세스가 함께 쓰는 저장소의 식별자. 파일 백엔드는 None."""
+        return None
+
+    def shared_version(self):
+        """메모리에 반영된 마지막 변경의, 모든 프로세스에 공통인 번호. 파일 백엔드는 None."""
+        return None
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.sync()
+
+
+class JsonFileBackend(_Backend):
+    """변경마다 todo.json 전체를 다시 쓰는 방식.
+
+    현재 상태 전체를 기록하므로 기록하는 동안 저장소 락을 잡는다.
+    """
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, self._io_lock:
+            yield
+
+    def load(self):
+        return read_json_file(self.path), []
+
+    def write(self, ops):
+        with self._locked():
+            if self.durability == "always":
+                self._sync_locked()
+            else:
+                self._dirty = True
+
+    def _sync_locked(self):
+        write_file_atomic(self.path, dump_todos(self._snapshot()))
+
+
+class WalBackend(_Backend):
+    """todo.json 스냅샷 + 추가 전용 연산 로그(todo.json.wal).
+
+    변경은 연산 한 줄(JSON)로 로그 끝에 추가되므로 쓰기 비용은 변경 크기에 비례한다.
+    로그가 compact_bytes를 넘으면 백그라운드에서 스냅샷으로 압축한다.
+    압축 중에는 기존 로그를 .wal.1 로 돌려 두고, 스냅샷 기록이 끝나면 지운다.
+    압축 도중 크래시가 나면 시작 시 스냅샷 + .wal.1 + .wal 순서로 재실행하며,
+    모든 연산은 여러 번 적용해도 결과가 같도록(멱등) 설계되어 있다.
+    """
+
+    def __init__(
+        self, path, durability="always", flush_interval=1.0, compact_bytes=1 << 20
+    ):
+        super().__init__(path, durability, flush_interval)
+        self.compact_bytes = compact_bytes
+        self.log_path = f"{path}.wal"
+        self.rotated_log_path = f"{path}.wal.1"
+        self._file = None
+        self._log_bytes = 0
+        self._valid_log_bytes = 0
+        self._compactor = None
+
+    def data_files(self):
+        return [self.path, self.log_path, self.rotated_log_path]
+
+    def _read_log(self, path):
+        """로그를 읽어 연산 목록과 정상적으로 기록된 바이트 수를 반환한다.
+
+        마지막 줄이 기록 도중 끊긴 경우 그 줄은 버린다.
+        """
+        ops = []
+        valid_bytes = 0
+        if not os.path.exists(path):
+            return ops, valid_bytes
+        with open(path, "rb") as file:
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("truncated record")
+                    ops.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Ignoring torn record at end of %s", path)
+                    break
+                valid_bytes += len(line)
+        return ops, valid_bytes
+
+    def load(self):
+        with self._io_lock:
+            todos = read_json_file(self.path)
+            rotated_ops, _ = self._read_log(self.rotated_log_path)
+            ops, self._valid_log_bytes = self._read_log(self.log_path)
+        return todos, rotated_ops + ops
+
+    def open(self, lock, snapshot):
+        super().open(lock, snapshot)
+        if os.path.exists(self.rotated_log_path):
+            # 이전 압축이 끝나지 못했으므로 재실행한 상태를 바로 스냅샷으로 남긴다
+            self._compact_on_open()
+        else:
+            self._file = open(self.log_path, "ab")
+            self._file.truncate(self._valid_log_bytes)
+            self._log_bytes = self._valid_log_bytes
+
+    def _compact_on_open(self):
+        write_file_atomic(self.path, dump_todos(self._snapshot()))
+        self._file = open(self.log_path, "wb")
+        os.fsync(self._file.fileno())
+        os.remove(self.rotated_log_path)
+
+    def write(self, ops):
+        data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+        encoded = data.encode("utf-8")
+        with self._io_lock:
+            try:
+                self._file.write(encoded)
+                self._file.flush()
+            except OSError:
+                # 끊긴 레코드 뒤에 다음 레코드가 붙지 않도록 되돌린다
+                self._file.truncate(self._log_bytes)
+                raise
+            if self.durability == "always":
+                os.fsync(self._file.fileno())
+            else:
+                self._dirty = True
+            self._log_bytes += len(encoded)
+            if self._log_bytes >= self.compact_bytes and self._compactor is None:
+                self._compactor = threading.Thread(
+                    target=self.compact, name="todo-wal-compactor", daemon=True
+                )
+                self._compactor.start()
+
+    def _sync_locked(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def compact(self):
+        """현재 상태를 스냅샷으로 기록하고 로그를 비운다."""
+        try:
+            with self._io_lock:
+                self._sync_locked()
+                self._dirty = False
+                # 이전 압축이 실패해 .wal.1 이 남아 있으면 덮어쓰지 않고 그대로 둔다
+                if not os.path.exists(self.rotated_log_path):
+                    self._file.close()
+                    os.replace(self.log_path, self.rotated_log_path)
+                    self._file = open(self.log_path, "ab")
+                    self._log_bytes = 0
+            # 메모리에는 기록된 연산이 모두 적용되어 있으므로 돌린 뒤의 상태는 .wal.1 을
+            # 모두 포함한다. 그 뒤 새 로그에 기록되는 연산은 재실행해도 결과가 같다
+            with self._lock:
+                todos = self._snapshot()
+            # 스냅샷 직렬화/기록은 락 밖에서 수행해 그동안에도 쓰기를 받는다
+            write_file_atomic(self.path, dump_todos(todos))
+            os.remove(self.rotated_log_path)
+        except OSError:
+            logger.exception("Failed to compact %s", self.log_path)
+        finally:
+            self._compactor = None
+
+    def close(self):
+        super().close()
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SqliteBackend(_Backend):
+    """SQLite(WAL 모드) 저장소.
+
+    하위 작업과 첨부 파일은 별도 테이블에 행 단위로 기록되므로 한 항목의 변경이
+    다른 데이터를 다시 쓰지 않는다. 모든 변경은 changes 테이블에도 남으며,
+    여러 uvicorn 워커가 같은 DB를 쓰면 각 워커는 PRAGMA data_version으로
+    다른 연결의 커밋을 감지하고 바뀐 항목만 다시 읽어 메모리 상태를 맞춘다.
+    DB가 비어 있으면 처음 한 번 seed_path(todo.json) 내용을 가져온다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS todos (
+            id INTEGER PRIMARY KEY,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            due_date TEXT,
+            status TEXT NOT NULL,
+            priority TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_todos_position ON todos (position);
+        CREATE INDEX IF NOT EXISTS idx_todos_status ON todos (status);
+        CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos (priority, status);
+        CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos (due_date, status);
+        CREATE TABLE IF NOT EXISTS subtasks (
+            todo_id INTEGER NOT NULL REFERENCES todos (id) ON DELETE CASCADE,
+            id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            completed INTEGER NOT NULL,
+            PRIMARY KEY (todo_id, id)
+        );
+        CREATE TABLE IF NOT EXISTS attachments (
+            todo_id INTEGER NOT NULL REFERENCES todos (id) ON DELETE CASCADE,
+            id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            size INTEGER,
+            sha256 TEXT,
+            PRIMARY KEY (todo_id, id)
+        );
+        -- todo_id가 NULL이면 전체 교체(replace)를 뜻한다
+        CREATE TABLE IF NOT EXISTS changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            todo_id INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    TODO_COLUMNS = ("title", "description", "due_date", "status", "priority")
+
+    def __init__(self, path, durability="always", flush_interval=1.0, seed_path=None):
+        super().__init__(path, durability, flush_interval)
+        self.seed_path = seed_path
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # WAL 모드에서 NORMAL은 커밋마다 fsync 하지 않고 체크포인트 때 동기화한다
+        synchronous = "FULL" if durability == "always" else "NORMAL"
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+        # DB를 새로 만들면 변경 번호가 다시 1부터 시작하므로 DB마다 식별자를 둔다
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('instance', ?)",
+            (uuid.uuid4().hex[:8],),
+        )
+        self._instance = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'instance'"
+        ).fetchone()[0]
+        self._data_version = None
+        self._last_change = 0
+
+    def _migrate(self):
+        # 이전 스키마로 만든 DB에 나중에 추가된 열을 붙인다
+        columns = {
+            row["name"] for row in self._conn.execute("PRAGMA table_info(attachments)")
+        }
+        for name, kind in (("size", "INTEGER"), ("sha256", "TEXT")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE attachments ADD COLUMN {name} {kind}")
+
+    def data_files(self):
+        return [self.path, f"{self.path}-wal"]
+
+    def instance_id(self):
+        return self._instance
+
+    def shared_version(self):
+        return self._last_change
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE로 쓰기 락을 먼저 잡아 워커 간 갱신이 직렬화되게 한다
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _max_change(self):
+        row = self._conn.execute("SELECT MAX(version) FROM changes").fetchone()
+        return row[0] or 0
+
+    def load(self):
+        with self._io_lock:
+            return self._load_locked()
+
+    def _load_locked(self):
+        if self.seed_path and os.path.exists(self.seed_path):
+            with self._transaction() as conn:
+                empty = conn.execute(
+                    "SELECT NOT EXISTS (SELECT 1 FROM todos)"
+                    " AND NOT EXISTS (SELECT 1 FROM changes)"
+                ).fetchone()[0]
+                if empty:
+                    self._replace(read_json_file(self.seed_path))
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._last_change = self._max_change()
+        return self._select_todos(), []
+
+    def _select_todos(self, todo_id=None):
+        if todo_id is None:
+            where, child_where, params = "", "", ()
+        else:
+            where, child_where, params = "WHERE id = ?", "WHERE todo_id = ?", (todo_id,)
+        todos = {}
+        for row in self._conn.execute(
+            f"SELECT * FROM todos {where} ORDER BY position", params
+        ):
+            todos[row["id"]] = {
+                "id": row["id"],
+                "title": row["title"],
+                "description": row["description"],
+                "due_date": row["due_date"],
+                "status": row["status"],
+                "priority": row["priority"],
+                "subtasks": [],
+                "attachments": [],
+            }
+        for row in self._conn.execute(
+            f"SELECT * FROM subtasks {child_where} ORDER BY todo_id, position", params
+        ):
+            todos[row["todo_id"]]["subtasks"].append(
+                {
+                    "id": row["id"],
+                    "title": row["title"],
+                    "completed": bool(row["completed"]),
+                }
+            )
+        for row in self._conn.execute(
+            f"SELECT * FROM attachments {child_where} ORDER BY todo_id, position",
+            params,
+        ):
+            todos[row["todo_id"]]["attachments"].append(
+                {
+                    "id": row["id"],
+                    "filename": row["filename"],
+                    "original_filename": row["original_filename"],
+                    "file_type": row["file_type"],
+                    "size": row["size"],
+                    "sha256": row["sha256"],
+                }
+            )
+        return list(todos.values())
+
+    def poll(self):
+        # 자신의 기록이 진행 중이면 기다리지 않고 다음 읽기 때 반영한다
+        if not self._io_lock.acquire(blocking=False):
+            return []
+        try:
+            return self._poll_locked()
+        finally:
+            self._io_lock.release()
+
+    def _poll_locked(self):
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return []
+        self._data_version = data_version
+        rows = self._conn.execute(
+            "SELECT version, todo_id FROM changes WHERE version > ? ORDER BY version",
+            (self._last_change,),
+        ).fetchall()
+        if not rows:
+            return []
+        self._last_change = rows[-1]["version"]
+        if any(row["todo_id"] is None for row in rows):
+            return [{"op": "replace", "todos": self._select_todos()}]
+        ops = []
+        for todo_id in dict.fromkeys(row["todo_id"] for row in rows):
+            todo = self._select_todos(todo_id)
+            if todo:
+                ops.append({"op": "create", "todo": todo[0]})
+            else:
+                ops.append({"op": "delete", "id": todo_id})
+        return ops
+
+    def write(self, ops):
+        with self._io_lock:
+            with self._transaction():
+                # 그 사이 다른 워커의 변경이 없었다면 자신의 변경은 다시 읽을 필요가 없다
+                up_to_date = self._max_change() == self._last_change
+                for op in ops:
+                    self._write_op(op)
+                if up_to_date:
+                    self._last_change = self._max_change()
+            if self.durability != "always":
+                self._dirty = True
+
+    def _write_op(self, op):
+        kind = op["op"]
+        if kind == "replace":
+            self._replace(op["todos"])
+            return
+        todo_id = (
+            op["todo"]["id"] if kind == "create" else op.get("id", op.get("todo_id"))
+        )
+        if kind == "create":
+            # 다른 워커가 같은 id를 먼저 만들었을 수 있으므로 DB에서 다시 확인한다
+            if self._conn.execute(
+                "SELECT 1 FROM todos WHERE id = ?", (todo_id,)
+            ).fetchone():
+                raise TodoAlreadyExists(todo_id)
+            self._upsert_todo(op["todo"])
+        elif kind == "delete":
+            self._conn.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+        elif kind == "update":
+            self._update_todo(todo_id, op["fields"])
+        elif kind == "put_subtask":
+            self._put_subtask(todo_id, op["subtask"])
+        elif kind == "delete_subtask":
+            self._conn.execute(
+                "DELETE FROM subtasks WHERE todo_id = ? AND id = ?",
+                (todo_id, op["subtask_id"]),
+            )
+        elif kind == "put_attachment":
+            self._put_attachment(todo_id, op["attachment"])
+        elif kind == "delete_attachment":
+            self._conn.execute(
+                "DELETE FROM attachments WHERE todo_id = ? AND id = ?",
+                (todo_id, op["attachment_id"]),
+            )
+        else:
+            raise ValueError(f"Unknown operation: {kind}")
+        self._conn.execute("INSERT INTO changes (todo_id) VALUES (?)", (todo_id,))
+
+    def _replace(self, todos):
+        self._conn.execute("DELETE FROM todos")
+        for todo in todos:
+            self._upsert_todo(todo)
+        self._conn.execute("INSERT INTO changes (todo_id) VALUES (NULL)")
+
+    def _upsert_todo(self, todo):
+        self._conn.execute(
+            """
+            INSERT INTO todos
+                (id, position, title, description, due_date, status, priority)
+            VALUES
+                (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM todos), ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                due_date = excluded.due_date,
+                status = excluded.status,
+                priority = excluded.priority
+            """,
+            (
+                todo["id"],
+                todo["title"],
+                todo.get("description", ""),
+                todo.get("due_date"),
+                todo.get("status", "시작 전"),
+                todo.get("priority"),
+            ),
+        )
+        self._replace_children(todo["id"], {"subtasks": [], "attachments": [], **todo})
+
+    def _update_todo(self, todo_id, fields):
+        columns = [column for column in self.TODO_COLUMNS if column in fields]
+        if columns:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            self._conn.execute(
+                f"UPDATE todos SET {assignments} WHERE id = ?",
+                (*(fields[column] for column in columns), todo_id),
+            )
+        self._replace_children(todo_id, fields)
+
+    def _replace_children(self, todo_id, fields):
+        if "subtasks" in fields:
+            self._conn.execute("DELETE FROM subtasks WHERE todo_id = ?", (todo_id,))
+            for subtask in fields["subtasks"]:
+                self._put_subtask(todo_id, subtask)
+        if "attachments" in fields:
+            self._conn.execute("DELETE FROM attachments WHERE todo_id = ?", (todo_id,))
+            for attachment in fields["attachments"]:
+                self._put_attachment(todo_id, attachment)
+
+    def _put_subtask(self, todo_id, subtask):
+        self._conn.execute(
+            """
+            INSERT INTO subtasks (todo_id, id, position, title, completed)
+            VALUES (?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM subtasks
+                           WHERE todo_id = ?), ?, ?)
+            ON CONFLICT (todo_id, id) DO UPDATE SET
+                title = excluded.title,
+                completed = excluded.completed
+            """,
+            (
+                todo_id,
+                subtask["id"],
+                todo_id,
+                subtask["title"],
+                subtask.get("completed", False),
+            ),
+        )
+
+    def _put_attachment(self, todo_id, attachment):
+        self._conn.execute(
+            """
+            INSERT INTO attachments
+                (todo_id, id, position, filename, original_filename, file_type,
+                 size, sha256)
+            VALUES (?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM attachments
+                           WHERE todo_id = ?), ?, ?, ?, ?, ?)
+            ON CONFLICT (todo_id, id) DO UPDATE SET
+                filename = excluded.filename,
+                original_filename = excluded.original_filename,
+                file_type = excluded.file_type,
+                size = excluded.size,
+                sha256 = excluded.sha256
+            """,
+            (
+                todo_id,
+                attachment["id"],
+                todo_id,
+                attachment["filename"],
+                attachment["original_filename"],
+                attachment["file_type"],
+                attachment.get("size"),
+                attachment.get("sha256"),
+            ),
+        )
+
+    def _sync_locked(self):
+        self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        super().close()
+        with self._io_lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    "json": JsonFileBackend,
+    "wal": WalBackend,
+    "sqlite": SqliteBackend,
+}
+
+
+def create_backend(kind, path, **options):
+    """path는 todo.json 경로다.
+
+    sqlite는 같은 이름의 .db 파일을 쓰며, DB가 비어 있으면 path를 초기 데이터로 가져온다.
+    """
+    try:
+        backend_class = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {kind}")
+    if backend_class is SqliteBackend:
+        options.setdefault("seed_path", path)
+        path = f"{os.path.splitext(path)[0]}.db"
+    return backend_class(path, **options)
+
+
+class _Commit:
+    """GroupCommitter에 넘긴 연산 묶음. wait()는 기록이 끝날 때까지 기다린다."""
+
+    def __init__(self, ops, version):
+        self.ops = ops
+        # 연산을 모두 적용한 직후의 저장소(메모리) 버전
+        self.version = version
+        self.error = None
+        self._done = threading.Event()
+
+    def finish(self, error=None):
+        self.error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class GroupCommitter:
+    """여러 요청의 변경을 모아 한 번에 기록하는 쓰기 스레드 (group commit).
+
+    submit()은 저장소 락을 잡은 상태에서, 이미 메모리에 적용된 연산을 큐에 넣는다.
+    쓰기 스레드는 락을 잡고 큐 전체를 꺼낸 뒤, 락을 놓고 backend.write() 한 번으로
+    기록한다 (always 정책이면 fsync도 한 번). 그래서 기록하는 동안에도 읽기는
+    메모리에서 바로 처리되고, 그동안 들어온 변경은 다음 배치가 된다.
+    직전 배치에 여러 요청이 묶였다면(동시 쓰기 중) 첫 변경 후 window 초 동안 더 모은다.
+    요청이 하나뿐일 때는 기다리지 않으므로 단일 요청의 지연은 늘지 않는다.
+    요청 스레드는 락을 놓은 뒤 자신의 배치가 기록될 때까지 기다린다.
+    """
+
+    def __init__(self, store, window):
+        self.window = window
+        self._store = store
+        self._cond = threading.Condition(store._lock)
+        self._queue = []
+        # 큐에서 꺼내 기록 중인 배치
+        self._batch = []
+        self._last = None
+        self._closing = False
+        self._concurrent = False
+        self._thread = threading.Thread(
+            target=self._run, name="todo-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, ops, version):
+        commit = _Commit(ops, version)
+        self._queue.append(commit)
+        self._last = commit
+        self._cond.notify()
+        return commit
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                closing = self._closing
+            if self.window and self._concurrent and not closing:
+                time.sleep(self.window)
+            with self._cond:
+                batch, self._queue = self._queue, []
+                self._batch = batch
+                self._concurrent = len(batch) > 1
+            self._write(batch)
+
+    def pending_ops(self):
+        """메모리에는 적용되었지만 아직 기록이 끝나지 않은 연산. 저장소 락을 잡고 호출한다."""
+        return [op for commit in self._batch + self._queue for op in commit.ops]
+
+    def _write(self, batch):
+        backend = self._store.backend
+        try:
+            with timed("store_write"):
+                backend.write([op for commit in batch for op in commit.ops])
+            errors = [None] * len(batch)
+        except Exception as error:
+            if len(batch) == 1:
+                errors = [error]
+            else:
+                # 한 요청의 실패(예: 다른 워커와의 id 충돌)가 같은 배치의
+                # 다른 요청까지 실패시키지 않도록 요청별로 나눠 다시 기록한다
+                errors = []
+                for commit in batch:
+                    try:
+                        backend.write(commit.ops)
+                        errors.append(None)
+                    except Exception as commit_error:
+                        errors.append(commit_error)
+        with self._cond:
+            self._batch = []
+            if not any(errors):
+                self._store._checkpoint(batch[-1].version)
+            else:
+                # 실패한 변경이 메모리에 남지 않도록 백엔드에 기록된 상태로 되돌린 뒤,
+                # 그 사이 큐에 들어온 (아직 기록 전인) 변경을 다시 적용한다
+                self._store._load()
+                for op in self.pending_ops():
+                    self._store._apply(op)
+        for commit, error in zip(batch, errors):
+            commit.finish(error)
+
+    def flush(self):
+        """지금까지 넘겨진 변경이 모두 기록될 때까지 기다린다."""
+        with self._cond:
+            last = self._last
+        if last is not None:
+            last._done.wait()
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+
+
+class TodoStore:
+    """시작 시 한 번 로드하여 메모리에서 읽기를 처리하는 저장소.
+
+    모든 쓰기는 연산(op) dict로 표현되어 메모리에 적용된 뒤 백엔드로 전달된다.
+    같은 연산 적용 코드가 시작 시 로그 재실행과, 다른 워커의 변경 반영(poll)에도 쓰인다.
+    항목은 연산을 적용할 때 한 번 검증되어 TodoRecord로 보관되며,
+    id로, 하위 작업과 첨부 파일은 항목별로 id 인덱스를 두어 상수 시간에 찾는다.
+    반환되는 레코드와 하위 dict는 저장소 내부 객체를 공유하므로 호출 측에서 수정하면 안 된다.
+
+    version()은 변경이 적용될 때마다 증가하는 데이터 버전이다. 시작(로드) 시
+    현재 시각(마이크로초)에서 출발하므로 재시작 후에도 이전 값보다 작아지지 않는다.
+    여러 워커가 함께 쓰는 백엔드(sqlite)에서는 대신 DB의 변경 번호를 버전으로 써서
+    같은 상태면 어느 워커에서든 같은 버전이 되게 한다 (instance가 그 DB의 식별자).
+    DB 변경 번호와 메모리 버전의 대응은 _checkpoints에 남겨 changes()에 쓴다.
+
+    commit_window(초)를 주면 쓰기는 GroupCommitter로 모아 기록되며, 쓰기 메서드는
+    자신의 변경이 기록된 뒤에 반환한다. None이면 호출한 스레드에서 바로 기록한다.
+    """
+
+    def __init__(self, backend, commit_window=None, change_retention=10000):
+        self.backend = backend
+        self.instance = backend.instance_id() or uuid.uuid4().hex[:8]
+        self._lock = threading.RLock()
+        self._version = 0
+        # (DB 변경 번호, 그 변경까지 반영된 메모리 버전). 두 값 모두 증가 순이다
+        self._checkpoints = deque(maxlen=change_retention)
+        self._counts = TodoCounts()
+        self._due_histogram = DueDateHistogram()
+        self._due_dates = DueDateIndex()
+        self._open_due_dates = DueDateIndex(include_completed=False)
+        self._ids = SortedIds()
+        self._text = NgramIndex()
+        self._by_status = GroupIndex(lambda todo: todo.status)
+        self._by_priority = GroupIndex(lambda todo: todo.priority)
+        self._by_has_attachments = GroupIndex(lambda todo: bool(todo.attachments))
+        self._changes = ChangeLog(lambda: self._version, change_retention)
+        # 항목이 바뀔 때마다 update(old, new)로 함께 갱신되는 보조 인덱스
+        self._indexes = [
+            self._counts,
+            self._due_histogram,
+            self._due_dates,
+            self._open_due_dates,
+            self._ids,
+            self._text,
+            self._by_status,
+            self._by_priority,
+            self._by_has_attachments,
+            self._changes,
+        ]
+        self._load()
+        backend.open(self._lock, self._snapshot)
+        self._pending_commit = None
+        self._committer = (
+            GroupCommitter(self, commit_window) if commit_window is not None else None
+        )
+
+    def add_index(self, index):
+        """update(old, new)/clear()를 가진 객체를 변경 시 함께 갱신되도록 등록한다."""
+        with self._lock:
+            self._indexes.append(index)
+            for todo in self._todos.values():
+                index.update(None, todo)
+
+    def _load(self):
+        with timed("store_load"):
+            todos, ops = self.backend.load()
+            self._version = max(self._version + 1, time.time_ns() // 1000)
+            self._reset(todos)
+            for op in ops:
+                self._apply(op)
+            self._checkpoints.clear()
+            self._checkpoint(self._version)
+
+    def _checkpoint(self, version):
+        """백엔드의 공유 변경 번호가 메모리 버전 version까지 반영되었음을 남긴다."""
+        shared = self.backend.shared_version()
+        if shared is None:
+            return
+        if not self._checkpoints or shared > self._checkpoints[-1][0]:
+            self._checkpoints.append((shared, version))
+
+    def _shared_version(self):
+        if self._checkpoints:
+            return self._checkpoints[-1][0]
+        return self._version
+
+    @contextmanager
+    def _synced(self):
+        """락을 잡고, 다른 프로세스가 남긴 변경이 있으면 먼저 반영한다."""
+        with self._lock:
+            ops = self.backend.poll()
+            for op in ops:
+                self._apply(op)
+            if ops:
+                self._checkpoint(self._version)
+            if ops and self._committer is not None:
+                # 반영한 항목은 DB에서 다시 읽은 상태이므로, 아직 기록되지 않은
+                # 자신의 변경을 그 위에 다시 적용한다 (기록도 그 뒤에 일어난다)
+                for op in self._committer.pending_ops():
+                    self._apply(op)
+            yield
+
+    @contextmanager
+    def _writing(self):
+        """_synced()와 같고, 블록에서 커밋한 변경이 기록될 때까지 락 밖에서 기다린다."""
+        with self._synced():
+            self._pending_commit = None
+            yield
+            commit, self._pending_commit = self._pending_commit, None
+        if commit is not None:
+            with timed("store_commit_wait"):
+                commit.wait()
+
+    def _snapshot(self):
+        # 항목은 copy-on-write로 교체되므로 얕은 복사만으로 일관된 상태가 된다
+        return list(self._todos.values())
+
+    # 인덱스
+    # _todos는 삽입 순서를 유지하는 id -> 항목 dict로 목록 순서와 id 인덱스를 겸한다.
+    # _positions는 항목별 목록 순번으로, 인덱스에서 찾은 후보를 목록 순서로 정렬할 때 쓴다.
+
+    def _reset(self, todos):
+        # 검증이 모두 끝난 뒤에 교체해 잘못된 항목이 있어도 기존 상태가 남게 한다
+        records = [TodoRecord.from_dict(todo) for todo in todos]
+        self._todos = {}
+        self._positions = {}
+        self._next_position = 0
+        self._subtasks = {}
+        self._attachments = {}
+        for index in self._indexes:
+            index.clear()
+        for record in records:
+            self._put(record)
+
+    def _put(self, todo):
+        todo_id = todo.id
+        old = self._todos.get(todo_id)
+        self._todos[todo_id] = todo
+        if old is None:
+            self._positions[todo_id] = self._next_position
+            self._next_position += 1
+        # 하위 목록이 그대로면(같은 tuple 객체) 인덱스를 다시 만들지 않는다
+        if old is None or old.subtasks is not todo.subtasks:
+            self._subtasks[todo_id] = {child["id"]: child for child in todo.subtasks}
+        if old is None or old.attachments is not todo.attachments:
+            self._attachments[todo_id] = {
+                child["id"]: child for child in todo.attachments
+            }
+        for index in self._indexes:
+            index.update(old, todo)
+
+    def _discard(self, todo_id):
+        old = self._todos.pop(todo_id, None)
+        self._positions.pop(todo_id, None)
+        self._subtasks.pop(todo_id, None)
+        self._attachments.pop(todo_id, None)
+        if old is not None:
+            for index in self._indexes:
+                index.update(old, None)
+
+    # 읽기
+
+    def version(self):
+        with self._synced():
+            return self._shared_version()
+
+    def applied_version(self):
+        """마지막으로 적용된 변경의 버전. 락 없이 읽으므로 인덱스 update() 안에서도 쓸 수 있다.
+
+        sqlite에서는 아직 DB 변경 번호가 정해지지 않은 변경도 있으므로 그 이전 번호가
+        되며, 이 버전부터의 changes()는 그 변경을 다시 포함한다.
+        """
+        return self._shared_version()
+
+    def all(self):
+        with self._synced():
+            return list(self._todos.values())
+
+    def get(self, todo_id):
+        with self._synced():
+            return self._todos.get(todo_id)
+
+    def page(self, cursor=None, limit=100):
+        """id 순으로 cursor(이전 페이지 마지막 id) 다음부터 limit개 항목과 다음 커서.
+
+        다음 페이지가 없으면 커서는 None이다.
+        """
+        with self._synced():
+            ids = self._ids.after(cursor, limit + 1)
+            todos = [self._todos[todo_id] for todo_id in ids[:limit]]
+        next_cursor = ids[limit - 1] if len(ids) > limit else None
+        return todos, next_cursor
+
+    def changes(self, since):
+        """since 버전 이후의 변경. (현재 버전, 변경 내용)을 반환한다.
+
+        변경 내용은 바뀌거나 새로 생긴 항목(현재 상태), 삭제된 항목 id,
+        남아 있는 항목에서 삭제된 하위 작업/첨부 파일 (항목 id, id) 목록의 dict이다.
+        since가 보존 범위를 벗어났으면 None이다.
+        """
+        with self._synced():
+            local = self._local_version(since)
+            changes = self._changes.since(local) if local is not None else None
+            if changes is None:
+                return self._shared_version(), None
+            todo_ids, removed_subtasks, removed_attachments = changes
+            return self._shared_version(), {
+                "todos": [
+                    self._todos[todo_id]
+                    for todo_id in todo_ids
+                    if todo_id in self._todos
+                ],
+                "deleted": [
+                    todo_id for todo_id in todo_ids if todo_id not in self._todos
+                ],
+                "deleted_subtasks": [
+                    item for item in removed_subtasks if item[0] in self._todos
+                ],
+                "deleted_attachments": [
+                    item for item in removed_attachments if item[0] in self._todos
+                ],
+            }
+
+    def _local_version(self, version):
+        """version()이 반환한 버전을 메모리 버전으로 바꾼다. 알 수 없으면 None.
+
+        sqlite에서는 version 이하의 가장 최근 대응점을 쓰므로, 다른 워커가 준 중간
+        번호라면 이미 받은 변경 일부를 한 번 더 돌려줄 뿐 빠뜨리지는 않는다.
+        """
+        if not self._checkpoints:
+            return version
+        index = bisect.bisect_right(
+            self._checkpoints, version, key=lambda checkpoint: checkpoint[0]
+        )
+        if index == 0:
+            return None
+        return self._checkpoints[index - 1][1]
+
+    def search(self, query, limit=None):
+        """제목/설명에 검색어가 포함된 항목을 관련도 순으로 반환한다."""
+        with self._synced():
+            return [self._todos[todo_id] for todo_id in self._text.search(query, limit)]
+
+    def query(
+        self,
+        status=(),
+        priority=(),
+        due_after=None,
+        due_before=None,
+        has_attachments=None,
+        sort="id",
+    ):
+        """조건을 모두 만족하는 항목을 sort 순으로 반환한다 (None이면 목록 순서).
+
+        status/priority는 값 목록(하나라도 일치), due_after/due_before는 경계를 제외한
+        마감일 범위다. 조건별 후보 수를 인덱스에서 구해 가장 적은 쪽만 훑고,
+        나머지 조건은 그 후보에 대해서만 확인한다.
+        """
+        due_start = due_after + ONE_DAY if due_after is not None else None
+        due_end = due_before - ONE_DAY if due_before is not None else None
+        with self._synced():
+            # (예상 후보 수, 후보 id를 만드는 함수)
+            plans = [(len(self._todos), self._todos.keys)]
+            if status:
+                plans.append(
+                    (
+                        self._by_status.count(status),
+                        partial(self._by_status.ids, status),
+                    )
+                )
+            if priority:
+                plans.append(
+                    (
+                        self._by_priority.count(priority),
+                        partial(self._by_priority.ids, priority),
+                    )
+                )
+            if due_start is not None or due_end is not None:
+                plans.append(
+                    (
+                        self._due_dates.count(due_start, due_end),
+                        partial(self._due_dates.ids, due_start, due_end),
+                    )
+                )
+            if has_attachments is not None:
+                plans.append(
+                    (
+                        self._by_has_attachments.count([has_attachments]),
+                        partial(self._by_has_attachments.ids, [has_attachments]),
+                    )
+                )
+            _, candidates = min(plans, key=lambda plan: plan[0])
+            todos = [
+                todo
+                for todo in map(self._todos.__getitem__, candidates())
+                if _matches(
+                    todo, status, priority, due_after, due_before, has_attachments
+                )
+            ]
+            if sort is None:
+                todos.sort(key=lambda todo: self._positions[todo.id])
+                return todos
+        return sort_todos(todos, sort)
+
+    def stats(self):
+        """상태/우선순위별 개수 (total, by_status, by_priority, by_priority_status)."""
+        with self._synced():
+            return self._counts.snapshot()
+
+    def completion_trend(self, start, end):
+        """start~end 각 날짜까지 마감인 (날짜, 전체 개수, 완료 개수) 목록."""
+        with self._synced():
+            return self._due_histogram.cumulative(start, end)
+
+    def open_due_between(self, start=None, end=None):
+        """미완료 항목 중 마감일이 start~end(포함)인 (마감일, 항목) 목록 (마감일 순)."""
+        with self._synced():
+            return self._open_due_dates.between(start, end)
+
+    def latest_due(self, limit):
+        """마감일이 늦은 순으로 limit개 항목."""
+        with self._synced():
+            return self._due_dates.latest(limit)
+
+    def get_subtask(self, todo_id, subtask_id):
+        with self._synced():
+            return self._require_subtask(todo_id, subtask_id)
+
+    def get_attachment(self, todo_id, attachment_id):
+        with self._synced():
+            return self._require_attachment(todo_id, attachment_id)
+
+    def _require(self, todo_id):
+        todo = self._todos.get(todo_id)
+        if todo is None:
+            raise TodoNotFound(todo_id)
+        return todo
+
+    def _require_subtask(self, todo_id, subtask_id):
+        self._require(todo_id)
+        subtask = self._subtasks[todo_id].get(subtask_id)
+        if subtask is None:
+            raise SubtaskNotFound(subtask_id)
+        return subtask
+
+    def _require_attachment(self, todo_id, attachment_id):
+        self._require(todo_id)
+        attachment = self._attachments[todo_id].get(attachment_id)
+        if attachment is None:
+            raise AttachmentNotFound(attachment_id)
+        return attachment
+
+    # 연산 적용
+    # 읽기 측이 받은 레코드가 직렬화 도중 바뀌지 않도록 항목은 항상 새 레코드로 교체한다.
+    # 재실행 시에도 쓰이므로 대상이 없으면 조용히 무시한다.
+
+    def _apply(self, op):
+        kind = op["op"]
+        self._version += 1
+        if kind == "replace":
+            self._reset(op["todos"])
+            return
+        if kind == "create":
+            self._put(TodoRecord.from_dict(op["todo"]))
+            return
+
+        todo_id = op["id"] if "id" in op else op["todo_id"]
+        todo = self._todos.get(todo_id)
+        if todo is None:
+            return
+        if kind == "delete":
+            self._discard(todo_id)
+        elif kind == "update":
+            self._put(todo.merge(op["fields"]))
+        elif kind == "put_subtask":
+            subtask = SubTask.model_validate(op["subtask"]).model_dump()
+            self._put(todo.replace(subtasks=_put_child(todo.subtasks, subtask)))
+        elif kind == "delete_subtask":
+            subtasks = _remove_child(todo.subtasks, op["subtask_id"])
+            self._put(todo.replace(subtasks=subtasks))
+        elif kind == "put_attachment":
+            attachment = Attachment.model_validate(op["attachment"]).model_dump()
+            self._put(
+                todo.replace(attachments=_put_child(todo.attachments, attachment))
+            )
+        elif kind == "delete_attachment":
+            attachments = _remove_child(todo.attachments, op["attachment_id"])
+            self._put(todo.replace(attachments=attachments))
+        else:
+            raise ValueError(f"Unknown operation: {kind}")
+
+    def _commit(self, *ops):
+        """연산들을 메모리에 적용하고 백엔드에 한 번에 기록한다.
+
+        group commit 중이면 기록은 쓰기 스레드에 맡기고, _writing()이 끝날 때 기다린다.
+        """
+        if not ops:
+            return
+        applied = False
+        try:
+            # 적용 단계: 항목 검증(TodoRecord 변환)과 인덱스 갱신
+            with timed("store_apply"):
+                for op in ops:
+                    self._apply(op)
+                    applied = True
+            if self._committer is None:
+                with timed("store_write"):
+                    self.backend.write(list(ops))
+                self._checkpoint(self._version)
+        except Exception:
+            # 일부라도 적용된 뒤 실패하면 메모리 상태를 백엔드에 남은 상태로 되돌린다
+            if applied:
+                self._load()
+            raise
+        if self._committer is not None:
+            self._pending_commit = self._committer.submit(list(ops), self._version)
+
+    # 쓰기
+
+    def replace(self, todos):
+        with self._writing():
+            self._commit({"op": "replace", "todos": list(todos)})
+
+    def create(self, todo):
+        with self._writing():
+            if todo["id"] in self._todos:
+                raise TodoAlreadyExists(todo["id"])
+            self._commit({"op": "create", "todo": todo})
+        return todo
+
+    def update(self, todo_id, fields):
+        with self._writing():
+            self._require(todo_id)
+            self._commit({"op": "update", "id": todo_id, "fields": fields})
+            return self._require(todo_id)
+
+    def delete(self, todo_id):
+        with self._writing():
+            if todo_id in self._todos:
+                self._commit({"op": "delete", "id": todo_id})
+
+    # 일괄 처리
+    # 처리할 수 있는 항목만 모아 한 번에 기록하고, 입력 순서대로 항목별 결과
+    # (성공이면 None, 실패면 예외 객체) 목록을 반환한다.
+
+    def create_many(self, todos):
+        for _ in range(len(todos)):
+            try:
+                return self._create_many(todos)
+            except TodoAlreadyExists:
+                # 그 사이 다른 워커가 같은 id를 만들어 기록 전체가 실패했다 (sqlite).
+                # 메모리는 DB 상태로 되돌려졌으므로 다시 확인하면 그 id는 실패로 표시되고
+                # 나머지만 기록된다
+                continue
+        return self._create_many(todos)
+
+    def _create_many(self, todos):
+        with self._writing():
+            ops, results, created = [], [], set()
+            for todo in todos:
+                todo_id = todo["id"]
+                if todo_id in self._todos or todo_id in created:
+                    results.append(TodoAlreadyExists(todo_id))
+                else:
+                    ops.append({"op": "create", "todo": todo})
+                    created.add(todo_id)
+                    results.append(None)
+            self._commit(*ops)
+        return results
+
+    def update_many(self, todo_ids, fields):
+        with self._writing():
+            ops, results = [], []
+            for todo_id in todo_ids:
+                if todo_id in self._todos:
+                    ops.append({"op": "update", "id": todo_id, "fields": fields})
+                    results.append(None)
+                else:
+                    results.append(TodoNotFound(todo_id))
+            self._commit(*ops)
+        return results
+
+    def delete_many(self, todo_ids):
+        with self._writing():
+            ops, results, deleted = [], [], set()
+            for todo_id in todo_ids:
+                if todo_id in self._todos and todo_id not in deleted:
+                    ops.append({"op": "delete", "id": todo_id})
+                    deleted.add(todo_id)
+                    results.append(None)
+                else:
+                    results.append(TodoNotFound(todo_id))
+            self._commit(*ops)
+        return results
+
+    def add_subtask(self, todo_id, subtask):
+        with self._writing():
+            self._require(todo_id)
+            self._commit({"op": "put_subtask", "todo_id": todo_id, "subtask": subtask})
+        return subtask
+
+    def update_subtask(self, todo_id, subtask_id, subtask):
+        subtask = {**subtask, "id": subtask_id}
+        with self._writing():
+            self._require_subtask(todo_id, subtask_id)
+            self._commit({"op": "put_subtask", "todo_id": todo_id, "subtask": subtask})
+        return subtask
+
+    def patch_subtask(self, todo_id, subtask_id, fields):
+        """fields에 있는 값만 바꾸고, 바뀐 하위 작업을 반환한다."""
+        with self._writing():
+            subtask = {**self._require_subtask(todo_id, subtask_id), **fields}
+            self._commit({"op": "put_subtask", "todo_id": todo_id, "subtask": subtask})
+        return subtask
+
+    def delete_subtask(self, todo_id, subtask_id):
+        with self._writing():
+            self._require_subtask(todo_id, subtask_id)
+            self._commit(
+                {"op": "delete_subtask", "todo_id": todo_id, "subtask_id": subtask_id}
+            )
+
+    def add_attachment(self, todo_id, attachment):
+        with self._writing():
+            self._require(todo_id)
+            self._commit(
+                {"op": "put_attachment", "todo_id": todo_id, "attachment": attachment}
+            )
+        return attachment
+
+    def delete_attachment(self, todo_id, attachment_id):
+        """첨부 파일 정보를 제거하고, 제거된 항목을 반환한다."""
+        with self._writing():
+            attachment = self._require_attachment(todo_id, attachment_id)
+            self._commit(
+                {
+                    "op": "delete_attachment",
+                    "todo_id": todo_id,
+                    "attachment_id": attachment_id,
+                }
+            )
+        return attachment
+
+    # 영속화
+
+    def flush(self):
+        if self._committer is not None:
+            self._committer.flush()
+        self.backend.sync()
+
+    def close(self):
+        if self._committer is not None:
+            self._committer.close()
+        self.backend.close()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import TodoRecord
+
+
+def make_todo(todo_id, **fields):
+    """테스트용 할 일 dict를 만든다. 지정하지 않은 필드는 기본값으로 채운다."""
+    return {
+        "id": todo_id,
+        "title": f"Task {todo_id}",
+        "description": "",
+        "due_date": None,
+        "status": "시작 전",
+        "priority": None,
+        "subtasks": [],
+        "attachments": [],
+        **fields,
+    }
+
+
+def make_record(todo_id, **fields):
+    """make_todo와 같은 기본값으로 TodoRecord를 만든다."""
+    return TodoRecord.from_dict(make_todo(todo_id, **fields))
@@ -0,0 +1,82 @@
+import gzip
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from access_log import AccessLogMiddleware, LokiBatchSink
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+
+def make_client(sample_rate):
+    app = FastAPI()
+    lines = []
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(AccessLogMiddleware, sink=lines.append, sample_rate=sample_rate)
+    return TestClient(app), lines
+
+
+def test_access_log_uses_route_template():
+    client, lines = make_client(sample_rate=1.0)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing/path")
+    assert [(line["route"], line["status"]) for line in lines] == [
+        ("/items/{item_id}", 200),
+        ("/items/{item_id}", 200),
+        ("unmatched", 404),
+    ]
+    assert lines[0]["method"] == "GET"
+    assert lines[0]["duration_ms"] >= 0
+
+
+def test_access_log_sampling_keeps_errors():
+    client, lines = make_client(sample_rate=0.0)
+    client.get("/items/1")
+    client.get("/items/0")
+    assert [line["status"] for line in lines] == [404]
+    assert lines[0]["sample_rate"] == 1.0
+
+
+def test_loki_sink_pushes_gzipped_batches():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.headers["Content-Encoding"], body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    sink = LokiBatchSink(
+        f"http://127.0.0.1:{server.server_port}/loki/api/v1/push",
+        labels={"application": "test"},
+        flush_interval=60,
+    )
+    for status in [200, 500]:
+        sink({"route": "/todos", "status": status})
+    sink.close()
+    server.shutdown()
+
+    assert len(received) == 1
+    encoding, body = received[0]
+    assert encoding == "gzip"
+    stream = json.loads(gzip.decompress(body))["streams"][0]
+    assert stream["stream"] == {"application": "test"}
+    assert [json.loads(line)["status"] for _, line in stream["values"]] == [200, 500]
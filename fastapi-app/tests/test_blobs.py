@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from blobs import BlobStore, extension
+from conftest import make_record
+from uploads import ReceivedFile
+
+
+def make_todo(todo_id, *filenames):
+    attachments = [
+        {
+            "id": filename,
+            "filename": filename,
+            "original_filename": "a.txt",
+            "file_type": "text/plain",
+        }
+        for filename in filenames
+    ]
+    return make_record(todo_id, attachments=attachments)
+
+
+def receive(directory, content, filename="a.txt"):
+    upload = ReceivedFile(str(directory))
+    upload.filename = filename
+    upload.write([content])
+    upload.finish()
+    upload.size = len(content)
+    return upload
+
+
+def test_blob_store_deduplicates_and_counts_references(tmp_path):
+    blobs = BlobStore(str(tmp_path))
+    first = receive(tmp_path, b"same")
+    name = blobs.put(first)
+    blobs.update(None, make_todo(1, name))
+    blobs.release(name, first)
+
+    second = receive(tmp_path, b"same")
+    assert blobs.put(second) == name
+    blobs.update(None, make_todo(2, name))
+    blobs.release(name, second)
+    # 같은 내용은 파일 하나만 남고 임시 파일도 정리된다
+    assert os.listdir(tmp_path) == [name]
+    assert blobs.usage() == {
+        "files": 1,
+        "bytes": 4,
+        "references": 2,
+        "referenced_files": 1,
+    }
+
+    blobs.update(make_todo(1, name), None)
+    assert blobs.collect([name]) == 0
+    blobs.update(make_todo(2, name), None)
+    assert blobs.collect([name]) == 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_blob_store_keeps_extension(tmp_path):
+    blobs = BlobStore(str(tmp_path))
+    uploads = [receive(tmp_path, b"img", name) for name in ["a.png", "b.PNG", "c"]]
+    names = [blobs.put(upload) for upload in uploads]
+    digest = uploads[0].sha256
+    assert names == [f"{digest}.png", f"{digest}.PNG", digest]
+    for name, upload in zip(names, uploads):
+        blobs.release(name, upload)
+
+    assert extension("../archive.tar.gz") == ".gz"
+    assert extension("weird.p ng") == ""
+    assert extension(None) == ""
+
+
+def test_blob_store_removes_unreferenced_upload(tmp_path):
+    blobs = BlobStore(str(tmp_path))
+    upload = receive(tmp_path, b"orphan")
+    name = blobs.put(upload)
+    # 참조를 기록하지 못했으면(항목 삭제 등) release에서 바로 지워진다
+    blobs.release(name, upload)
+    assert os.listdir(tmp_path) == []
+
+
+def test_blob_store_cleans_up_failed_persist(tmp_path, monkeypatch):
+    blobs = BlobStore(str(tmp_path))
+    upload = receive(tmp_path, b"broken")
+
+    def fail(path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(upload, "persist", fail)
+    with pytest.raises(OSError):
+        blobs.put(upload)
+    # 업로드 중 표시와 임시 파일이 남지 않는다
+    assert not upload.pending
+    assert os.listdir(tmp_path) == []
+    assert blobs.usage()["files"] == 0
+
+    # 같은 내용을 다시 올리면 정상적으로 저장되고, 참조가 없으면 지워진다
+    retry = receive(tmp_path, b"broken")
+    name = blobs.put(retry)
+    blobs.release(name, retry)
+    assert os.listdir(tmp_path) == []
+
+
+def test_blob_store_gc_respects_grace(tmp_path):
+    (tmp_path / "legacy.txt").write_bytes(b"old")
+    (tmp_path / "used.txt").write_bytes(b"used")
+    blobs = BlobStore(str(tmp_path), grace=60)
+    blobs.update(None, make_todo(1, "used.txt"))
+
+    assert blobs.gc() == 0
+    past = time.time() - 120
+    os.utime(tmp_path / "legacy.txt", (past, past))
+    os.utime(tmp_path / "used.txt", (past, past))
+    assert blobs.gc() == 1
+    assert sorted(os.listdir(tmp_path)) == ["used.txt"]
+
+    # 전체 교체 후 다시 참조되지 않은 파일도 대상이 된다
+    blobs.clear()
+    assert blobs.collect(["used.txt"]) == 1
@@ -0,0 +1,77 @@
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache import (
+    ResultCache,
+    due_alerts_key,
+    priority_completion_key,
+)
+from conftest import make_record
+from prometheus_client import REGISTRY
+
+
+def cache_requests(name, result):
+    value = REGISTRY.get_sample_value(
+        "todo_result_cache_requests_total", {"name": name, "result": result}
+    )
+    return value or 0
+
+
+def test_result_cache_invalidates_on_dependent_fields():
+    cache = ResultCache()
+    cache.register("priority", priority_completion_key)
+    cache.register("alerts", due_alerts_key)
+    calls = []
+
+    def compute(name):
+        return lambda: calls.append(name) or len(calls)
+
+    todo = make_record(1, priority="높음")
+    cache.update(None, todo)
+    assert cache.get("priority", (), compute("priority")) == 1
+    assert cache.get("priority", (), compute("priority")) == 1
+    assert cache.get("alerts", (), compute("alerts")) == 2
+
+    # 마감일 없는 항목의 제목 변경은 어느 결과에도 영향이 없다
+    renamed = todo.merge({"title": "Renamed"})
+    cache.update(todo, renamed)
+    assert cache.get("priority", (), compute("priority")) == 1
+    assert cache.get("alerts", (), compute("alerts")) == 2
+
+    # 마감일이 생기면 알림 결과만 다시 계산한다
+    due = renamed.merge({"due_date": "2025-01-02"})
+    cache.update(renamed, due)
+    assert cache.get("priority", (), compute("priority")) == 1
+    assert cache.get("alerts", (), compute("alerts")) == 3
+
+    cache.update(due, due.merge({"status": "완료"}))
+    assert cache.get("priority", (), compute("priority")) == 4
+    assert calls == ["priority", "alerts", "alerts", "priority"]
+
+
+def test_result_cache_expires_at_midnight():
+    today = datetime.date(2025, 1, 1)
+    cache = ResultCache(today=lambda: today)
+    cache.register("alerts", due_alerts_key)
+    hits = cache_requests("alerts", "hit")
+    misses = cache_requests("alerts", "miss")
+
+    assert cache.get("alerts", (), lambda: "first") == "first"
+    assert cache.get("alerts", (), lambda: "second") == "first"
+    today = datetime.date(2025, 1, 2)
+    assert cache.get("alerts", (), lambda: "third") == "third"
+
+    assert cache_requests("alerts", "hit") == hits + 1
+    assert cache_requests("alerts", "miss") == misses + 2
+
+
+def test_result_cache_keeps_params_apart_and_bounded():
+    cache = ResultCache(max_entries=2)
+    cache.register("trend", priority_completion_key)
+    for days in [1, 2, 3]:
+        cache.get("trend", (days,), lambda: days)
+    assert cache.get("trend", (3,), lambda: "new") == 3
+    assert cache.get("trend", (1,), lambda: "new") == "new"
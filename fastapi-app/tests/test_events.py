@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import make_record
+from events import EventBroker
+from prometheus_client import REGISTRY
+
+
+def subscribers():
+    return REGISTRY.get_sample_value("todo_event_subscribers")
+
+
+def test_broker_publishes_changes():
+    async def run():
+        broker = EventBroker(lambda: "v1")
+        subscriber = broker.subscribe()
+        assert subscribers() == 1
+
+        broker.update(None, make_record(1, title="A"))
+        broker.update(make_record(1), None)
+        events = await subscriber.get(1)
+        assert [event["type"] for event in events] == ["upsert", "delete"]
+        assert events[0]["todo"]["title"] == "A"
+        assert events[1] == {"type": "delete", "id": 1, "version": "v1"}
+        assert await subscriber.get(0.01) == []
+
+        broker.unsubscribe(subscriber)
+        broker.unsubscribe(subscriber)
+        assert subscribers() == 0
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_gets_resync():
+    async def run():
+        broker = EventBroker(lambda: "v1", max_events=2)
+        subscriber = broker.subscribe()
+        for todo_id in range(5):
+            broker.update(None, make_record(todo_id))
+        # 큐가 넘치면 쌓인 이벤트 대신 resync 하나만 남는다
+        assert [event["type"] for event in await subscriber.get(1)] == ["resync"]
+
+        broker.clear()
+        assert [event["type"] for event in await subscriber.get(1)] == ["resync"]
+        broker.unsubscribe(subscriber)
+
+    asyncio.run(run())
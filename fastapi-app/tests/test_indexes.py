@@ -0,0 +1,148 @@
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import make_record
+from indexes import (
+    DueDateHistogram,
+    DueDateIndex,
+    GroupIndex,
+    NgramIndex,
+    SortedIds,
+    TodoCounts,
+)
+
+
+def test_counts_follow_updates():
+    counts = TodoCounts()
+    first = make_record(1, priority="높음")
+    second = make_record(2, status="완료", priority="낮음")
+    counts.update(None, first)
+    counts.update(None, second)
+
+    updated = first.merge({"status": "완료"})
+    counts.update(first, updated)
+    counts.update(second, None)
+
+    assert counts.total == 1
+    assert dict(counts.by_status) == {"완료": 1}
+    assert dict(counts.by_priority) == {"높음": 1}
+    assert dict(counts.by_priority_status) == {("높음", "완료"): 1}
+
+
+def test_counts_group_missing_priority():
+    counts = TodoCounts()
+    counts.update(None, make_record(1, status="완료"))
+    counts.update(None, make_record(2))
+
+    snapshot = counts.snapshot()
+    assert snapshot["by_priority"] == {}
+    assert snapshot["by_priority_status"] == {
+        ("없음", "완료"): 1,
+        ("없음", "시작 전"): 1,
+    }
+
+
+def test_due_date_histogram_cumulative():
+    histogram = DueDateHistogram()
+    first = make_record(1, status="완료", due_date="2025-01-02")
+    second = make_record(2, due_date="2025-01-04")
+    histogram.update(None, first)
+    histogram.update(None, second)
+    histogram.update(None, make_record(3, status="완료"))
+    histogram.update(second, second.merge({"status": "완료"}))
+
+    rows = histogram.cumulative(datetime.date(2025, 1, 1), datetime.date(2025, 1, 5))
+    assert [(total, completed) for _, total, completed in rows] == [
+        (0, 0),
+        (1, 1),
+        (1, 1),
+        (2, 2),
+        (2, 2),
+    ]
+
+    histogram.update(first, None)
+    rows = histogram.cumulative(datetime.date(2025, 1, 3), datetime.date(2025, 1, 4))
+    assert rows == [
+        (datetime.date(2025, 1, 3), 0, 0),
+        (datetime.date(2025, 1, 4), 1, 1),
+    ]
+
+
+def test_due_date_index_ranges_and_latest():
+    index = DueDateIndex(include_completed=False)
+    todos = [
+        make_record(10, due_date="2025-01-03"),
+        make_record(5, status="진행 중", due_date="2025-01-01"),
+        make_record(7, due_date="2025-01-03"),
+        make_record(8),
+    ]
+    for todo in todos:
+        index.update(None, todo)
+
+    rows = index.between(datetime.date(2025, 1, 2), datetime.date(2025, 1, 3))
+    # 같은 마감일은 id가 아니라 추가된 순서를 따른다
+    assert [todo.id for _, todo in rows] == [10, 7]
+    assert [todo.id for todo in index.latest(2)] == [10, 7]
+
+    index.update(todos[0], todos[0].merge({"status": "완료"}))
+    assert [todo.id for _, todo in index.between()] == [5, 7]
+    index.update(todos[1], None)
+    assert [todo.id for todo in index.latest(5)] == [7]
+
+
+def test_sorted_ids_pages_after_cursor():
+    ids = SortedIds()
+    todos = [make_record(todo_id) for todo_id in [30, 10, 20, 40]]
+    for todo in todos:
+        ids.update(None, todo)
+    ids.update(todos[2], todos[2].merge({"status": "완료"}))
+    ids.update(todos[3], None)
+
+    assert ids.after(None, 2) == [10, 20]
+    assert ids.after(10, 5) == [20, 30]
+    assert ids.after(15, 1) == [20]
+    assert ids.after(30, 5) == []
+
+
+def test_ngram_index_ranks_substring_matches():
+    index = NgramIndex()
+    todos = [
+        make_record(1, title="팀 미팅 준비", description="주간 회의 안건 정리"),
+        make_record(2, title="회의록 작성", description="팀 미팅 내용"),
+        make_record(3, title="Buy milk", description=""),
+        make_record(4, title="미팅룸 예약", description=""),
+    ]
+    for todo in todos:
+        index.update(None, todo)
+
+    # 제목 시작 일치 > 제목 중간 일치 > 설명 일치
+    assert index.search("미팅") == [4, 1, 2]
+    assert index.search("미팅", limit=2) == [4, 1]
+    assert index.search("팀 회의") == [1, 2]
+    assert index.search("MILK") == [3]
+    assert index.search("미") == [4, 1, 2]
+    assert index.search("미팅 milk") == []
+    assert index.search("  ") == []
+
+    index.update(todos[3], todos[3].merge({"title": "회의실 예약"}))
+    index.update(todos[0], None)
+    assert index.search("미팅") == [2]
+    assert index.search("회의실") == [4]
+
+
+def test_group_index_tracks_key_changes():
+    index = GroupIndex(lambda todo: todo.status)
+    first = make_record(1)
+    second = make_record(2, status="완료")
+    index.update(None, first)
+    index.update(None, second)
+    index.update(first, first.merge({"status": "완료"}))
+
+    assert index.count(["완료"]) == 2
+    assert index.ids(["완료", "시작 전"]) == {1, 2}
+    index.update(second, None)
+    assert index.ids(["완료"]) == {1}
+    assert index.count(["시작 전"]) == 0
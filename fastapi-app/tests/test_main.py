@@ -1,4 +1,7 @@
 from io import BytesIO
+import asyncio
+import hashlib
+import json
 import sys
 import os
 import datetime
@@ -8,6 +11,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import pytest
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 from main import UPLOAD_DIRECTORY, app, save_todos, load_todos, TodoItem, TodoStatus
 
 client = TestClient(app)
@@ -43,6 +47,164 @@ def test_get_todos_with_items():
     assert response.json()[0]["title"] == "Test"
 
 
+def test_read_endpoints_keep_response_schema():
+    # 빠른 직렬화 경로를 써도 OpenAPI 응답 스키마는 그대로 TodoItem 목록이다
+    paths = client.get("/openapi.json").json()["paths"]
+    for path in ["/todos", "/todos/search", "/todos/priority/{priority}"]:
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]
+        assert schema["schema"]["items"] == {"$ref": "#/components/schemas/TodoItem"}
+
+
+def test_get_todos_pages_by_cursor():
+    save_todos(
+        [
+            TodoItem(
+                id=todo_id, title=f"Todo {todo_id}", description="", due_date=None
+            ).model_dump(mode="json")
+            for todo_id in [3, 1, 2]
+        ]
+    )
+    first = client.get("/todos", params={"limit": 2})
+    assert first.status_code == 200
+    assert [todo["id"] for todo in first.json()] == [1, 2]
+    assert first.headers["X-Next-Cursor"] == "2"
+
+    second = client.get(
+        "/todos", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [todo["id"] for todo in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+    # 페이지 옵션이 없으면 전체 목록을 저장 순서대로 반환한다
+    assert [todo["id"] for todo in client.get("/todos").json()] == [3, 1, 2]
+    assert client.get("/todos", params={"limit": 0}).status_code == 422
+
+
+def test_get_todos_projection():
+    todo = TodoItem(
+        id=1,
+        title="Projected",
+        description="",
+        due_date=None,
+        subtasks=[{"id": 1, "title": "Sub"}],
+    )
+    save_todos([todo.model_dump(mode="json")])
+
+    response = client.get("/todos", params={"fields": "title,status"})
+    assert response.json() == [{"id": 1, "title": "Projected", "status": "시작 전"}]
+
+    response = client.get("/todos", params={"include_children": "false"})
+    assert "subtasks" not in response.json()[0]
+    assert "attachments" not in response.json()[0]
+    assert response.json()[0]["description"] == ""
+
+    response = client.get("/todos", params={"fields": "title,password"})
+    assert response.status_code == 422
+
+
+def test_get_todos_filters_and_sort():
+    save_todos(
+        [
+            TodoItem(
+                id=todo_id,
+                title=f"Todo {todo_id}",
+                description="",
+                due_date=due_date,
+                status=status,
+                priority=priority,
+            ).model_dump(mode="json")
+            for todo_id, due_date, status, priority in [
+                (1, "2025-01-05", "완료", "높음"),
+                (2, "2025-01-02", "시작 전", "높음"),
+                (3, "2025-01-03", "진행 중", "낮음"),
+                (4, None, "시작 전", "높음"),
+            ]
+        ]
+    )
+
+    def ids(**params):
+        response = client.get("/todos", params=params)
+        assert response.status_code == 200
+        return [todo["id"] for todo in response.json()]
+
+    assert ids(priority="높음", status="시작 전") == [2, 4]
+    assert ids(status=["시작 전", "진행 중"], due_after="2025-01-02") == [3]
+    assert ids(due_before="2025-01-05", sort="-due_date") == [3, 2]
+    assert ids(sort="-id", limit=2) == [4, 3]
+
+    response = client.get("/todos", params={"priority": "높음", "limit": 2})
+    assert [todo["id"] for todo in response.json()] == [1, 2]
+    assert response.headers["X-Next-Cursor"] == "2"
+    assert ids(priority="높음", limit=2, cursor=2) == [4]
+
+    assert client.get("/todos", params={"sort": "password"}).status_code == 422
+    response = client.get("/todos", params={"sort": "title", "cursor": 1})
+    assert response.status_code == 422
+
+
+def test_list_and_dashboard_etags():
+    todo = TodoItem(id=1, title="Cached", description="", due_date=None)
+    client.post("/todos", json=todo.model_dump(mode="json"))
+
+    for path in ["/todos", "/todos/stats", "/dashboard", "/dashboard/due-alerts"]:
+        response = client.get(path)
+        etag = response.headers["ETag"]
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        response = client.get(path, headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+
+    etag = client.get("/todos").headers["ETag"]
+    client.patch("/todos/1", json={"status": "완료"})
+    response = client.get("/todos", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == "완료"
+    assert response.headers["ETag"] != etag
+
+    # 다른 경로에는 ETag를 붙이지 않는다
+    assert "ETag" not in client.get("/todos/1/subtasks").headers
+
+
+def test_not_modified_passes_through_middlewares():
+    etag = client.get("/todos/stats").headers["ETag"]
+    labels = {"handler": "/todos/stats", "method": "GET", "status": "3xx"}
+    before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+    response = client.get(
+        "/todos/stats",
+        headers={"If-None-Match": etag, "Origin": "http://example.com"},
+    )
+    assert response.status_code == 304
+    assert response.headers["Access-Control-Allow-Origin"] == "http://example.com"
+    assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 1
+
+    # 매개변수 검증이 ETag 확인보다 먼저다
+    for path, query in [
+        ("/todos", "limit=abc"),
+        ("/todos", "fields=bogus"),
+        ("/todos", "cursor=1&sort=title"),
+        ("/dashboard/completion-trend", "from=2025-02-01&to=2025-01-01"),
+    ]:
+        etag = client.get(path).headers["ETag"]
+        response = client.get(f"{path}?{query}", headers={"If-None-Match": etag})
+        assert response.status_code == 422
+
+
+def test_dashboard_cache_follows_mutations():
+    todo = TodoItem(id=1, title="Cached", description="", due_date=None)
+    client.post("/todos", json=todo.model_dump(mode="json"))
+    assert client.get("/dashboard/priority-completion").json()[0]["completed"] == 0
+    assert client.get("/dashboard").json()["summary"]["completed"] == 0
+
+    client.patch("/todos/1", json={"status": "완료"})
+    assert client.get("/dashboard/priority-completion").json()[0]["completed"] == 1
+    assert client.get("/dashboard").json()["summary"]["completed"] == 1
+
+    metrics = client.get("/metrics").text
+    assert "todo_result_cache_requests_total" in metrics
+
+
 def test_create_todo():
     todo = {
         "id": 1,
@@ -57,12 +219,122 @@ def test_create_todo():
     assert response.json()["status"] == "시작 전"
 
 
+def test_create_todo_duplicate_id():
+    todo = {
+        "id": 1,
+        "title": "Test",
+        "description": "Test description",
+        "due_date": None,
+        "status": "시작 전",
+    }
+    assert client.post("/todos", json=todo).status_code == 200
+    response = client.post("/todos", json={**todo, "title": "Duplicate"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "To-Do item already exists"
+    assert [t["title"] for t in load_todos()] == ["Test"]
+
+
 def test_create_todo_invalid():
     todo = {"id": 1, "title": "Test"}
     response = client.post("/todos", json=todo)
     assert response.status_code == 422
 
 
+def test_bulk_endpoints():
+    todos = [
+        TodoItem(id=todo_id, title=f"Todo {todo_id}", description="", due_date=None)
+        for todo_id in [1, 2, 1]
+    ]
+    response = client.post(
+        "/todos/bulk", json=[todo.model_dump(mode="json") for todo in todos]
+    )
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": 1, "status_code": 200},
+        {"id": 2, "status_code": 200},
+        {"id": 1, "status_code": 409, "detail": "To-Do item already exists"},
+    ]
+
+    response = client.patch(
+        "/todos/bulk", json={"ids": [1, 2, 3], "fields": {"status": "완료"}}
+    )
+    assert [result["status_code"] for result in response.json()["results"]] == [
+        200,
+        200,
+        404,
+    ]
+    assert [todo["status"] for todo in client.get("/todos").json()] == ["완료", "완료"]
+    assert [todo["title"] for todo in client.get("/todos").json()] == [
+        "Todo 1",
+        "Todo 2",
+    ]
+
+    response = client.patch("/todos/bulk", json={"ids": [1], "fields": {"title": None}})
+    assert response.status_code == 422
+
+    response = client.request("DELETE", "/todos/bulk", json={"ids": [2, 5]})
+    assert [result["status_code"] for result in response.json()["results"]] == [
+        200,
+        404,
+    ]
+    assert [todo["id"] for todo in client.get("/todos").json()] == [1]
+
+
+def test_patch_todo_merges_fields():
+    todo = TodoItem(
+        id=1,
+        title="Original",
+        description="Keep me",
+        due_date="2025-01-02",
+        priority="높음",
+        subtasks=[{"id": 1, "title": "Sub"}],
+    )
+    client.post("/todos", json=todo.model_dump(mode="json"))
+
+    response = client.patch(
+        "/todos/1",
+        json={"status": "완료", "priority": None},
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    assert response.status_code == 200
+    patched = response.json()
+    assert patched["status"] == "완료"
+    assert patched["priority"] is None
+    assert patched["title"] == "Original"
+    assert patched["description"] == "Keep me"
+    assert patched["due_date"] == "2025-01-02"
+    assert patched["subtasks"] == [{"id": 1, "title": "Sub", "completed": False}]
+    assert client.get("/todos").json() == [patched]
+
+    assert client.patch("/todos/1", json={"title": None}).status_code == 422
+    assert client.patch("/todos/1", json={"unknown": 1}).status_code == 422
+    assert client.patch("/todos/2", json={"title": "x"}).status_code == 404
+
+
+def test_patch_subtask():
+    todo = TodoItem(
+        id=1,
+        title="Todo",
+        description="",
+        due_date=None,
+        subtasks=[{"id": 1, "title": "Sub"}, {"id": 2, "title": "Other"}],
+    )
+    client.post("/todos", json=todo.model_dump(mode="json"))
+
+    response = client.patch("/todos/1/subtasks/1", json={"completed": True})
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "title": "Sub", "completed": True}
+    assert client.get("/todos/1/subtasks").json() == [
+        {"id": 1, "title": "Sub", "completed": True},
+        {"id": 2, "title": "Other", "completed": False},
+    ]
+
+    response = client.patch("/todos/1/subtasks/3", json={"completed": True})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Subtask not found"
+    assert client.patch("/todos/1/subtasks/1", json={"title": None}).status_code == 422
+
+
 def test_update_todo():
     todo = TodoItem(
         id=1,
@@ -85,6 +357,24 @@ def test_update_todo():
     assert response.json()["status"] == "완료"
 
 
+def test_update_todo_rejects_id_change():
+    save_todos(
+        [
+            TodoItem(id=todo_id, title=title, description="", due_date=None).model_dump(
+                mode="json"
+            )
+            for todo_id, title in [(1, "one"), (2, "two")]
+        ]
+    )
+    changed = {"id": 2, "title": "changed", "description": "", "due_date": None}
+    response = client.put("/todos/1", json=changed)
+    assert response.status_code == 422
+    assert [(t["id"], t["title"]) for t in client.get("/todos").json()] == [
+        (1, "one"),
+        (2, "two"),
+    ]
+
+
 def test_update_todo_not_found():
     updated_todo = {
         "id": 1,
@@ -166,6 +456,83 @@ def test_search_todos():
     assert response.json()[0]["title"] == "Buy milk"
 
 
+def test_search_todos_description_and_limit():
+    save_todos(
+        [
+            TodoItem(
+                id=todo_id, title=title, description=description, due_date=None
+            ).model_dump(mode="json")
+            for todo_id, title, description in [
+                (1, "주간 보고", "팀 미팅 자료 정리"),
+                (2, "팀 미팅 준비", ""),
+                (3, "운동", ""),
+            ]
+        ]
+    )
+    response = client.get("/todos/search", params={"query": "미팅"})
+    assert [todo["id"] for todo in response.json()] == [2, 1]
+
+    response = client.get("/todos/search", params={"query": "미팅", "limit": 1})
+    assert [todo["id"] for todo in response.json()] == [2]
+
+    response = client.get("/todos/search", params={"query": ""})
+    assert len(response.json()) == 3
+
+
+def test_get_changes():
+    save_todos([{"id": 1, "title": "A", "description": "", "due_date": None}])
+    # since가 없으면 전체 목록으로 재동기화한다
+    response = client.get("/todos/changes")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resync"] is True
+    assert [todo["id"] for todo in body["todos"]] == [1]
+
+    client.post(
+        "/todos", json={"id": 2, "title": "B", "description": "", "due_date": None}
+    )
+    client.delete("/todos/1")
+    body = client.get("/todos/changes", params={"since": body["version"]}).json()
+    assert body["resync"] is False
+    assert [todo["id"] for todo in body["todos"]] == [2]
+    assert body["deleted"] == [1]
+
+    # 다른 프로세스의 버전은 재동기화, 형식이 잘못되면 422
+    body = client.get("/todos/changes", params={"since": "other-1"}).json()
+    assert body["resync"] is True
+    assert client.get("/todos/changes", params={"since": "x"}).status_code == 422
+
+
+def stage_count(stage, route):
+    value = REGISTRY.get_sample_value(
+        "todo_stage_duration_seconds_count", {"stage": stage, "route": route}
+    )
+    return value or 0
+
+
+def test_stage_metrics_by_route():
+    before = {
+        key: stage_count(*key)
+        for key in [
+            ("serialize", "/todos"),
+            ("store_apply", "/todos"),
+            ("store_commit_wait", "/todos"),
+            ("compute", "/dashboard"),
+        ]
+    }
+    client.post(
+        "/todos", json={"id": 1, "title": "A", "description": "", "due_date": None}
+    )
+    client.get("/todos")
+    client.get("/dashboard")
+    for key, count in before.items():
+        assert stage_count(*key) == count + 1, key
+
+    metrics = client.get("/metrics").text
+    assert "todo_items 1.0" in metrics
+    assert "todo_data_file_bytes" in metrics
+
+
 def test_todo_stats():
     save_todos(
         [
@@ -193,6 +560,85 @@ def test_todo_stats():
     assert stats["not_completed"] == 1
 
 
+def test_event_stream(monkeypatch):
+    # TestClient는 응답 본문을 끝까지 모은 뒤 돌려주므로 ASGI 앱을 직접 호출한다
+    monkeypatch.setattr("main.EVENT_POLL_INTERVAL", 0.05)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/events",
+        "raw_path": b"/events",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def run():
+        disconnected = asyncio.Event()
+        requested = False
+        chunks = asyncio.Queue()
+        messages = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                await chunks.put(message["body"].decode())
+
+        async def next_event():
+            while True:
+                chunk = await asyncio.wait_for(chunks.get(), 5)
+                if not chunk.startswith(":"):
+                    lines = dict(
+                        line.split(": ", 1) for line in chunk.split("\n") if line
+                    )
+                    return lines["event"], json.loads(lines["data"])
+
+        task = asyncio.create_task(app(scope, receive, send))
+        try:
+            kind, data = await next_event()
+            assert kind == "stats"
+            assert data["total"] == 0
+
+            payload = {"id": 1, "title": "A", "description": "", "due_date": None}
+            response = await asyncio.to_thread(client.post, "/todos", json=payload)
+            assert response.status_code == 200
+            kind, data = await next_event()
+            assert kind == "upsert"
+            assert data["todo"]["title"] == "A"
+            kind, data = await next_event()
+            assert kind == "stats"
+            assert data["total"] == 1
+
+            response = await asyncio.to_thread(client.delete, "/todos/1")
+            assert response.status_code == 200
+            kind, data = await next_event()
+            assert (kind, data["id"]) == ("delete", 1)
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(task, 5)
+
+        start = messages[0]
+        assert start["status"] == 200
+        headers = dict(start["headers"])
+        assert headers[b"content-type"].startswith(b"text/event-stream")
+        assert REGISTRY.get_sample_value("todo_event_subscribers") == 0
+
+    asyncio.run(run())
+
+
 def test_load_todos_not_existing_file():
     # 파일이 없는 경우
     TODO_FILE = "todo.json"
@@ -283,6 +729,8 @@ def test_upload_attachment():
     attachment_info = response.json()
     assert attachment_info["original_filename"] == file_name
     assert attachment_info["file_type"] == "text/plain"
+    assert attachment_info["size"] == len(file_content)
+    assert attachment_info["sha256"] == hashlib.sha256(file_content).hexdigest()
     assert "id" in attachment_info
     assert "filename" in attachment_info  # 서버에 저장된 파일 이름
 
@@ -298,6 +746,32 @@ def test_upload_attachment():
     assert updated_todos[0]["attachments"][0]["original_filename"] == file_name
 
 
+def test_upload_attachment_limits(monkeypatch):
+    save_todos([{"id": 1, "title": "A", "description": "", "due_date": None}])
+    monkeypatch.setattr("main.MAX_UPLOAD_BYTES", 10)
+    files = {"file": ("big.txt", BytesIO(b"x" * 11), "text/plain")}
+    response = client.post("/todos/1/attachments", files=files)
+    assert response.status_code == 413
+
+    response = client.post("/todos/1/attachments", data={"other": "x"}, files={})
+    assert response.status_code == 422
+    truncated = (
+        b'--XX\r\nContent-Disposition: form-data; name="file"; '
+        b'filename="a.txt"\r\n\r\npartial'
+    )
+    response = client.post(
+        "/todos/1/attachments",
+        content=truncated,
+        headers={"content-type": "multipart/form-data; boundary=XX"},
+    )
+    assert response.status_code == 422
+    # 받다 만 임시 파일은 남지 않는다
+    assert not [
+        name for name in os.listdir(UPLOAD_DIRECTORY) if name.startswith(".upload-")
+    ]
+    assert load_todos()[0]["attachments"] == []
+
+
 def test_upload_attachment_todo_not_found():
     file_content = b"This is a test file content."
     file_name = "test_document.txt"
@@ -375,6 +849,47 @@ def test_download_attachment():
     assert download_response.content == file_content
 
 
+def test_download_attachment_conditional_and_range(monkeypatch):
+    save_todos([{"id": 1, "title": "A", "description": "", "due_date": None}])
+    content = b"0123456789"
+    attachment = client.post(
+        "/todos/1/attachments",
+        files={"file": ("digits.txt", BytesIO(content), "text/plain")},
+    ).json()
+    url = f"/todos/1/attachments/{attachment['id']}/download"
+
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    last_modified = response.headers["last-modified"]
+    assert (
+        client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    )
+
+    response = client.get(url, headers={"Range": "bytes=2-4"})
+    assert response.status_code == 206
+    assert response.content == b"234"
+    assert response.headers["content-range"] == "bytes 2-4/10"
+
+    # nginx로 넘기는 모드에서는 본문 없이 X-Accel-Redirect만 보낸다
+    monkeypatch.setattr("main.ATTACHMENT_ACCEL_PREFIX", "/protected-uploads/")
+    response = client.get(url)
+    assert response.headers["x-accel-redirect"] == (
+        "/protected-uploads/" + attachment["filename"]
+    )
+    assert (
+        response.headers["content-disposition"] == 'attachment; filename="digits.txt"'
+    )
+    assert response.content == b""
+
+    # 파일 이름에 확장자가 남아 있어 정적 경로도 원래 형식으로 응답한다
+    assert attachment["filename"].endswith(".txt")
+    response = client.get(f"/uploads/{attachment['filename']}")
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-type"].startswith("text/plain")
+
+
 def test_download_attachment_todo_not_found():
     response = client.get(f"/todos/999/attachments/{uuid.uuid4()}/download")
     assert response.status_code == 404
@@ -460,6 +975,34 @@ def test_delete_attachment():
     assert not os.path.exists(saved_file_path)
 
 
+def test_attachments_share_identical_content():
+    save_todos(
+        [
+            {"id": todo_id, "title": "A", "description": "", "due_date": None}
+            for todo_id in [1, 2]
+        ]
+    )
+    responses = [
+        client.post(
+            f"/todos/{todo_id}/attachments",
+            files={"file": (f"{todo_id}.txt", BytesIO(b"shared"), "text/plain")},
+        ).json()
+        for todo_id in [1, 2]
+    ]
+    filename = responses[0]["filename"]
+    digest = hashlib.sha256(b"shared").hexdigest()
+    assert filename == responses[1]["filename"] == f"{digest}.txt"
+    usage = client.get("/attachments/usage").json()
+    assert usage["references"] == 2
+
+    # 다른 항목이 참조하는 동안에는 파일이 남는다
+    path = os.path.join(UPLOAD_DIRECTORY, filename)
+    client.delete(f"/todos/1/attachments/{responses[0]['id']}")
+    assert os.path.exists(path)
+    client.delete(f"/todos/2/attachments/{responses[1]['id']}")
+    assert not os.path.exists(path)
+
+
 def test_delete_attachment_todo_not_found():
     response = client.delete(f"/todos/999/attachments/{uuid.uuid4()}")
     assert response.status_code == 404
@@ -481,3 +1024,206 @@ def test_delete_attachment_not_found_in_todo():
     response = client.delete(f"/todos/1/attachments/{uuid.uuid4()}")
     assert response.status_code == 404
     assert response.json()["detail"] == "Attachment not found"
+
+
+def test_dashboard_summary():
+    save_todos(
+        [
+            {
+                "id": 1,
+                "title": "A",
+                "description": "",
+                "due_date": None,
+                "status": "완료",
+                "priority": "높음",
+            },
+            {
+                "id": 2,
+                "title": "B",
+                "description": "",
+                "due_date": None,
+                "status": "진행 중",
+                "priority": "높음",
+            },
+            {
+                "id": 3,
+                "title": "C",
+                "description": "",
+                "due_date": None,
+                "status": "시작 전",
+                "priority": "낮음",
+            },
+        ]
+    )
+    client.delete("/todos/3")
+    client.put(
+        "/todos/2",
+        json={
+            "id": 2,
+            "title": "B",
+            "description": "",
+            "due_date": None,
+            "status": "완료",
+        },
+    )
+
+    dashboard = client.get("/dashboard").json()
+    assert dashboard["summary"] == {
+        "total": 2,
+        "completed": 2,
+        "in_progress": 0,
+        "not_started": 0,
+        "completion_rate": 100.0,
+    }
+    assert dashboard["priority_distribution"] == [{"priority": "높음", "count": 2}]
+    assert client.get("/todos/stats").json() == {
+        "total": 2,
+        "completed": 2,
+        "not_completed": 0,
+    }
+
+
+def test_priority_completion():
+    save_todos(
+        [
+            {
+                "id": 1,
+                "title": "A",
+                "description": "",
+                "due_date": None,
+                "status": "완료",
+                "priority": "높음",
+            },
+            {
+                "id": 2,
+                "title": "B",
+                "description": "",
+                "due_date": None,
+                "status": "진행 중",
+                "priority": "높음",
+            },
+            {
+                "id": 3,
+                "title": "C",
+                "description": "",
+                "due_date": None,
+                "status": "완료",
+                "priority": "낮음",
+            },
+        ]
+    )
+    response = client.get("/dashboard/priority-completion")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"priority": "낮음", "total": 1, "completed": 1, "completion_rate": 100.0},
+        {"priority": "높음", "total": 2, "completed": 1, "completion_rate": 50.0},
+    ]
+
+
+def test_completion_trend():
+    today = datetime.date.today()
+    save_todos(
+        [
+            {
+                "id": 1,
+                "title": "A",
+                "description": "",
+                "due_date": str(today - datetime.timedelta(days=40)),
+                "status": "완료",
+            },
+            {
+                "id": 2,
+                "title": "B",
+                "description": "",
+                "due_date": str(today - datetime.timedelta(days=1)),
+                "status": "진행 중",
+            },
+            {
+                "id": 3,
+                "title": "C",
+                "description": "",
+                "due_date": None,
+                "status": "완료",
+            },
+        ]
+    )
+    response = client.get("/dashboard/completion-trend")
+    assert response.status_code == 200
+    trend = response.json()
+    assert len(trend) == 30
+    assert trend[0]["date"] == str(today - datetime.timedelta(days=29))
+    assert trend[0]["total"] == 1
+    assert trend[0]["completion_rate"] == 100.0
+    assert trend[-1] == {
+        "date": str(today),
+        "total": 2,
+        "completed": 1,
+        "completion_rate": 50.0,
+    }
+
+    assert len(client.get("/dashboard/completion-trend?days=365").json()) == 365
+
+
+def test_completion_trend_range():
+    save_todos(
+        [
+            {
+                "id": 1,
+                "title": "A",
+                "description": "",
+                "due_date": "2025-01-02",
+                "status": "완료",
+            },
+        ]
+    )
+    response = client.get("/dashboard/completion-trend?from=2025-01-01&to=2025-01-03")
+    assert [(d["date"], d["total"]) for d in response.json()] == [
+        ("2025-01-01", 0),
+        ("2025-01-02", 1),
+        ("2025-01-03", 1),
+    ]
+
+    response = client.get("/dashboard/completion-trend?from=2025-01-03&to=2025-01-01")
+    assert response.status_code == 422
+
+
+def test_dashboard_due_lists_and_alerts():
+    today = datetime.date.today()
+
+    def todo(todo_id, days, status="시작 전"):
+        return {
+            "id": todo_id,
+            "title": f"T{todo_id}",
+            "description": "",
+            "due_date": str(today + datetime.timedelta(days=days)),
+            "status": status,
+        }
+
+    save_todos(
+        [
+            todo(1, -1),
+            todo(2, -5),
+            todo(3, 0),
+            todo(4, 2),
+            todo(5, 6),
+            todo(6, -3, status="완료"),
+            todo(7, 30, status="완료"),
+        ]
+    )
+
+    dashboard = client.get("/dashboard").json()
+    assert [(t["id"], t["days_overdue"]) for t in dashboard["overdue"]] == [
+        (2, 5),
+        (1, 1),
+    ]
+    assert [(t["id"], t["days_left"]) for t in dashboard["due_soon"]] == [
+        (3, 0),
+        (4, 2),
+    ]
+    assert [t["id"] for t in dashboard["recent_activity"]] == [7, 5, 4, 3, 1]
+
+    alerts = client.get("/dashboard/due-alerts").json()
+    assert [t["id"] for t in alerts["overdue"]] == [2, 1]
+    assert [t["id"] for t in alerts["today"]] == [3]
+    assert alerts["tomorrow"] == []
+    assert [(t["id"], t["days_left"]) for t in alerts["this_week"]] == [(4, 2), (5, 6)]
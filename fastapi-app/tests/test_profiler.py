@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from profiler import Profiler, ProfileRequestMiddleware
+
+
+def busy_handler():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    return {"ok": True}
+
+
+def test_profile_single_request():
+    profiler = Profiler("secret", interval=0.001)
+    app = FastAPI()
+    app.get("/busy")(busy_handler)
+    app.add_middleware(ProfileRequestMiddleware, profiler=profiler)
+    client = TestClient(app)
+
+    # 토큰이 없거나 틀리면 채집하지 않는다
+    assert "x-profile-id" not in client.get("/busy").headers
+    assert "x-profile-id" not in client.get("/busy", headers={"X-Profile": "x"}).headers
+
+    response = client.get("/busy", headers={"X-Profile": "secret"})
+    assert response.json() == {"ok": True}
+    counts = profiler.get(response.headers["x-profile-id"])
+    assert any("busy_handler (test_profiler.py" in stack for stack in counts)
+
+
+def test_profile_endpoint_requires_token(monkeypatch):
+    import main
+
+    client = TestClient(main.app)
+    assert client.get("/debug/profile").status_code == 404
+
+    monkeypatch.setattr(main, "PROFILER_TOKEN", "secret")
+    monkeypatch.setattr(main.profiler, "token", "secret")
+    assert client.get("/debug/profile").status_code == 401
+    response = client.get(
+        "/debug/profile",
+        params={"seconds": 0.05, "interval_ms": 1},
+        headers={"Authorization": "Bearer secret"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        assert stack and int(count) > 0
+        # 채집을 기다리는 핸들러 자신의 스택은 담지 않는다
+        assert "profile_worker" not in stack
+    response = client.get(
+        "/debug/profiles/unknown", headers={"Authorization": "Bearer secret"}
+    )
+    assert response.status_code == 404
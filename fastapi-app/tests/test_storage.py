@@ -0,0 +1,618 @@
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from conftest import make_todo
+from models import Priority, TodoStatus
+from pydantic import ValidationError
+from storage import (
+    JsonFileBackend,
+    SqliteBackend,
+    SubtaskNotFound,
+    TodoAlreadyExists,
+    TodoNotFound,
+    TodoStore,
+    WalBackend,
+    create_backend,
+)
+
+
+def read_json(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def test_store_loads_file_once(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text(json.dumps([make_todo(1)]))
+    store = TodoStore(JsonFileBackend(str(path)))
+
+    # 로드 이후 파일이 지워져도 메모리에서 조회된다
+    os.remove(path)
+    assert [todo.id for todo in store.all()] == [1]
+
+
+def test_store_always_writes_through(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(JsonFileBackend(str(path), durability="always"))
+    store.create(make_todo(1))
+    store.update(1, {"title": "Updated"})
+    assert read_json(path)[0]["title"] == "Updated"
+
+
+def test_store_never_writes_on_close(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(JsonFileBackend(str(path), durability="never"))
+    store.create(make_todo(1))
+    assert not path.exists()
+
+    store.close()
+    assert [todo["id"] for todo in read_json(path)] == [1]
+
+
+def test_store_returned_items_are_not_mutated(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    store.create(make_todo(1))
+    before = store.get(1)
+    store.add_subtask(1, {"id": 1, "title": "Sub", "completed": False})
+
+    assert before.subtasks == ()
+    assert store.get(1).subtasks[0]["title"] == "Sub"
+
+
+def test_store_keeps_parsed_records(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    store.create(make_todo(1, due_date="2025-01-02", priority="높음"))
+    store.update(1, {"status": "완료"})
+
+    todo = store.get(1)
+    assert todo.due_date == datetime.date(2025, 1, 2)
+    assert todo.status is TodoStatus.completed
+    assert todo.priority is Priority.high
+    assert todo.to_dict()["due_date"] == "2025-01-02"
+
+    # 잘못된 값은 적용 전에 거부되어 기존 상태가 유지된다
+    with pytest.raises(ValidationError):
+        store.update(1, {"due_date": "not-a-date"})
+    with pytest.raises(ValidationError):
+        store.replace([make_todo(2, status="unknown")])
+    assert [todo.id for todo in store.all()] == [1]
+
+
+def test_store_query_combines_filters(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    attachment = {
+        "id": "a1",
+        "filename": "a1.txt",
+        "original_filename": "a.txt",
+        "file_type": "text/plain",
+    }
+    store.replace(
+        [
+            make_todo(1, status="완료", priority="높음", due_date="2025-01-05"),
+            make_todo(2, priority="높음", due_date="2025-01-02"),
+            make_todo(3, priority="낮음", due_date="2025-01-03"),
+            make_todo(4, priority="높음", attachments=[attachment]),
+            make_todo(5, status="진행 중", due_date="2025-01-10"),
+        ]
+    )
+
+    def ids(**filters):
+        return [todo.id for todo in store.query(**filters)]
+
+    assert ids(priority=[Priority.high]) == [1, 2, 4]
+    assert ids(priority=[Priority.high], status=[TodoStatus.not_started]) == [2, 4]
+    assert ids(
+        status=[TodoStatus.not_started, TodoStatus.in_progress],
+        due_after=datetime.date(2025, 1, 2),
+    ) == [3, 5]
+    assert ids(due_before=datetime.date(2025, 1, 5), sort="-due_date") == [3, 2]
+    assert ids(has_attachments=True) == [4]
+    assert ids(has_attachments=False, priority=[Priority.high]) == [1, 2]
+    # 값이 없는 항목은 정렬 방향과 관계없이 뒤에 온다
+    assert ids(sort="due_date") == [2, 3, 1, 5, 4]
+    assert ids(sort="-due_date") == [5, 1, 3, 2, 4]
+    assert ids(sort="priority") == [1, 2, 4, 3, 5]
+
+    store.update(2, {"status": "완료"})
+    store.delete_attachment(4, "a1")
+    assert ids(status=[TodoStatus.completed]) == [1, 2]
+    assert ids(has_attachments=True) == []
+
+    # sort=None이면 목록(저장) 순서를 유지한다
+    store.delete(1)
+    store.create(make_todo(1, priority="높음"))
+    assert ids(priority=[Priority.high]) == [1, 2, 4]
+    assert ids(priority=[Priority.high], sort=None) == [2, 4, 1]
+
+
+def test_store_bulk_writes_once(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(JsonFileBackend(str(path)))
+    store.create(make_todo(1))
+    writes = []
+    write = store.backend.write
+    store.backend.write = lambda ops: writes.append(len(ops)) or write(ops)
+
+    errors = store.create_many([make_todo(2), make_todo(1), make_todo(3), make_todo(2)])
+    assert [type(error) for error in errors] == [
+        type(None),
+        TodoAlreadyExists,
+        type(None),
+        TodoAlreadyExists,
+    ]
+    errors = store.update_many([1, 3, 9], {"status": "완료"})
+    assert [error is None for error in errors] == [True, True, False]
+    errors = store.delete_many([2, 2, 9])
+    assert [error is None for error in errors] == [True, False, False]
+
+    assert writes == [2, 2, 1]
+    assert [(todo["id"], todo["status"]) for todo in read_json(path)] == [
+        (1, "완료"),
+        (3, "완료"),
+    ]
+
+    # 처리할 항목이 없으면 기록하지 않는다
+    store.delete_many([9])
+    assert writes == [2, 2, 1]
+
+
+def test_group_commit_batches_concurrent_writes(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(WalBackend(str(path)), commit_window=0.05)
+    writes = []
+    write = store.backend.write
+    store.backend.write = lambda ops: writes.append(len(ops)) or write(ops)
+
+    def create(todo_id):
+        store.create(make_todo(todo_id))
+        # 반환 시점에는 이미 로그에 기록되어 있다
+        assert todo_id in [todo.id for todo in TodoStore(WalBackend(str(path))).all()]
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    assert sum(writes) == 8
+    assert len(writes) < 8
+    reopened = TodoStore(WalBackend(str(path)))
+    assert sorted(todo.id for todo in reopened.all()) == list(range(1, 9))
+
+
+def test_group_commit_isolates_failed_requests(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")), commit_window=0.05)
+    write = store.backend.write
+
+    def failing_write(ops):
+        if any(op["op"] == "create" and op["todo"]["id"] == 2 for op in ops):
+            raise OSError("disk full")
+        write(ops)
+
+    store.backend.write = failing_write
+    errors = {}
+
+    def create(todo_id):
+        try:
+            store.create(make_todo(todo_id))
+        except OSError as error:
+            errors[todo_id] = error
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(1, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert list(errors) == [2]
+    assert sorted(todo.id for todo in store.all()) == [1, 3]
+    store.close()
+
+
+def test_group_commit_reads_do_not_wait_for_write(tmp_path):
+    for backend in (
+        WalBackend(str(tmp_path / "todo.json")),
+        SqliteBackend(str(tmp_path / "todo.db")),
+    ):
+        store = TodoStore(backend, commit_window=0)
+        store.create(make_todo(1))
+        writing, release = threading.Event(), threading.Event()
+        write = backend.write
+
+        def slow_write(ops):
+            writing.set()
+            release.wait()
+            write(ops)
+
+        backend.write = slow_write
+        writer = threading.Thread(target=store.create, args=(make_todo(2),))
+        writer.start()
+        assert writing.wait(1)
+
+        # 기록(fsync)이 끝나지 않아도 메모리 상태는 바로 읽힌다
+        reader = threading.Thread(target=lambda: [store.get(1), store.all()])
+        reader.start()
+        reader.join(1)
+        blocked = reader.is_alive()
+        finished_early = not writer.is_alive()
+
+        release.set()
+        writer.join()
+        reader.join()
+        store.close()
+        assert not blocked
+        assert not finished_early
+
+
+def test_group_commit_failure_keeps_queued_writes(tmp_path):
+    path = str(tmp_path / "todo.json")
+    store = TodoStore(WalBackend(path), commit_window=0)
+    writing, release = threading.Event(), threading.Event()
+    write = store.backend.write
+
+    def failing_write(ops):
+        if any(op["op"] == "create" and op["todo"]["id"] == 1 for op in ops):
+            writing.set()
+            release.wait()
+            raise OSError("disk full")
+        write(ops)
+
+    store.backend.write = failing_write
+    errors = []
+    first = threading.Thread(
+        target=lambda: errors.append(pytest.raises(OSError, store.create, make_todo(1)))
+    )
+    first.start()
+    assert writing.wait(1)
+    # 실패할 배치를 기록하는 동안 들어온 변경은 되돌린 뒤에도 메모리에 남는다
+    second = threading.Thread(target=store.create, args=(make_todo(2),))
+    second.start()
+    deadline = time.monotonic() + 1
+    while not store._committer._queue and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    first.join()
+    second.join()
+
+    assert len(errors) == 1
+    assert [todo.id for todo in store.all()] == [2]
+    store.close()
+    assert [todo.id for todo in TodoStore(WalBackend(path)).all()] == [2]
+
+
+def test_store_version_increases(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(WalBackend(str(path)))
+    first = store.version()
+    store.create(make_todo(1))
+    store.update(1, {"title": "Updated"})
+    assert store.version() == first + 2
+    store.close()
+
+    # 재시작 후에도 이전 버전보다 작아지지 않는다
+    assert TodoStore(WalBackend(str(path))).version() > first + 2
+
+
+def test_store_changes_since_version(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")), change_retention=4)
+    store.create(make_todo(1, subtasks=[{"id": 1, "title": "A", "completed": False}]))
+    store.create(make_todo(2))
+    since = store.version()
+
+    store.update(1, {"title": "Updated"})
+    store.delete_subtask(1, 1)
+    store.delete(2)
+    store.create(make_todo(3))
+    version, changes = store.changes(since)
+    assert version == since + 4
+    assert [todo.id for todo in changes["todos"]] == [1, 3]
+    assert changes["todos"][0].title == "Updated"
+    assert changes["deleted"] == [2]
+    assert changes["deleted_subtasks"] == [(1, 1)]
+    assert store.changes(version)[1] == {
+        "todos": [],
+        "deleted": [],
+        "deleted_subtasks": [],
+        "deleted_attachments": [],
+    }
+
+    # 보존 범위를 벗어났거나 전체 교체 이전 버전이면 재동기화가 필요하다
+    store.create(make_todo(4))
+    assert store.changes(since)[1] is None
+    assert store.changes(since + 1)[1] is not None
+    store.replace([make_todo(5)])
+    assert store.changes(version)[1] is None
+    assert store.changes(store.version())[1]["todos"] == []
+    store.close()
+
+
+def test_store_not_found_errors(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    with pytest.raises(TodoNotFound):
+        store.update(1, {"title": "x"})
+    store.create(make_todo(1))
+    with pytest.raises(SubtaskNotFound):
+        store.delete_subtask(1, 99)
+
+
+def test_store_update_keeps_todo_id(tmp_path):
+    for kind in ("json", "wal", "sqlite"):
+        path = str(tmp_path / f"{kind}.json")
+        store = TodoStore(create_backend(kind, path))
+        store.create(make_todo(1, title="one"))
+        store.create(make_todo(2, title="two"))
+        todo = store.update(1, make_todo(2, title="changed"))
+        assert todo.id == 1
+        assert [(t.id, t.title) for t in store.all()] == [(1, "changed"), (2, "two")]
+        store.close()
+
+        reopened = TodoStore(create_backend(kind, path))
+        assert [(t.id, t.title) for t in reopened.all()] == [
+            (1, "changed"),
+            (2, "two"),
+        ]
+        reopened.close()
+
+
+def test_store_indexes_children_by_id(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    attachment = {
+        "id": "a1",
+        "filename": "a1.txt",
+        "original_filename": "a.txt",
+        "file_type": "text/plain",
+        "size": 5,
+        "sha256": "a" * 64,
+    }
+    store.create(make_todo(1, attachments=[attachment]))
+    store.add_subtask(1, {"id": 7, "title": "Sub", "completed": False})
+
+    assert store.get_subtask(1, 7)["title"] == "Sub"
+    assert store.get_attachment(1, "a1") == attachment
+    store.delete_subtask(1, 7)
+    with pytest.raises(SubtaskNotFound):
+        store.get_subtask(1, 7)
+    with pytest.raises(TodoNotFound):
+        store.get_attachment(2, "a1")
+
+
+def test_store_rejects_duplicate_ids(tmp_path):
+    store = TodoStore(WalBackend(str(tmp_path / "todo.json")))
+    store.create(make_todo(1))
+    with pytest.raises(TodoAlreadyExists):
+        store.create(make_todo(1, title="Duplicate"))
+    assert store.get(1).title == "Task 1"
+
+
+def test_store_rejects_unknown_durability(tmp_path):
+    with pytest.raises(ValueError):
+        create_backend("json", str(tmp_path / "todo.json"), durability="sometimes")
+    with pytest.raises(ValueError):
+        create_backend("csv", str(tmp_path / "todo.json"))
+
+
+def test_wal_appends_instead_of_rewriting_snapshot(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text(json.dumps([make_todo(1)]))
+    store = TodoStore(WalBackend(str(path)))
+    store.update(1, {"status": "완료"})
+    store.add_subtask(1, {"id": 1, "title": "Sub", "completed": False})
+
+    # 스냅샷은 그대로이고 변경은 로그에만 기록된다
+    assert read_json(path)[0]["status"] == "시작 전"
+    lines = (tmp_path / "todo.json.wal").read_text().splitlines()
+    assert [json.loads(line)["op"] for line in lines] == ["update", "put_subtask"]
+
+    reopened = TodoStore(WalBackend(str(path)))
+    assert reopened.get(1).status == "완료"
+    assert reopened.get(1).subtasks[0]["title"] == "Sub"
+
+
+def test_wal_ignores_torn_last_record(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(WalBackend(str(path)))
+    store.create(make_todo(1))
+    store.close()
+    with open(tmp_path / "todo.json.wal", "a") as file:
+        file.write('{"op": "create", "todo": {"id": 2')
+
+    reopened = TodoStore(WalBackend(str(path)))
+    assert [todo.id for todo in reopened.all()] == [1]
+    reopened.create(make_todo(3))
+    assert [todo.id for todo in TodoStore(WalBackend(str(path))).all()] == [1, 3]
+
+
+def test_wal_compaction_folds_log_into_snapshot(tmp_path):
+    path = tmp_path / "todo.json"
+    backend = WalBackend(str(path), compact_bytes=1 << 30)
+    store = TodoStore(backend)
+    for todo_id in range(1, 4):
+        store.create(make_todo(todo_id))
+    store.delete(2)
+
+    backend.compact()
+    assert [todo["id"] for todo in read_json(path)] == [1, 3]
+    assert (tmp_path / "todo.json.wal").read_text() == ""
+    assert not (tmp_path / "todo.json.wal.1").exists()
+
+
+def test_wal_recovers_from_interrupted_compaction(tmp_path):
+    path = tmp_path / "todo.json"
+    store = TodoStore(WalBackend(str(path)))
+    store.create(make_todo(1))
+    store.create(make_todo(2))
+    store.close()
+
+    # 스냅샷까지 기록한 뒤 .wal.1 을 지우기 전에 중단된 상황
+    path.write_text(json.dumps([make_todo(1), make_todo(2)]))
+    os.replace(tmp_path / "todo.json.wal", tmp_path / "todo.json.wal.1")
+    (tmp_path / "todo.json.wal").write_text(
+        json.dumps({"op": "delete", "id": 1}) + "\n"
+    )
+
+    reopened = TodoStore(WalBackend(str(path)))
+    assert [todo.id for todo in reopened.all()] == [2]
+    assert not (tmp_path / "todo.json.wal.1").exists()
+    assert [todo["id"] for todo in read_json(path)] == [2]
+
+
+def test_sqlite_persists_rows(tmp_path):
+    path = str(tmp_path / "todo.db")
+    store = TodoStore(SqliteBackend(path))
+    store.create(make_todo(1, due_date="2025-06-03", priority="높음"))
+    store.add_subtask(1, {"id": 1, "title": "Sub", "completed": True})
+    store.add_attachment(
+        1,
+        {
+            "id": "a1",
+            "filename": "a1.txt",
+            "original_filename": "a.txt",
+            "file_type": "text/plain",
+        },
+    )
+    store.update(1, {"status": "완료"})
+    store.close()
+
+    reopened = TodoStore(SqliteBackend(path))
+    todo = reopened.get(1)
+    assert todo.status == "완료"
+    assert todo.priority == "높음"
+    assert todo.subtasks == ({"id": 1, "title": "Sub", "completed": True},)
+    assert todo.attachments[0]["id"] == "a1"
+
+
+def test_sqlite_seeds_from_json_once(tmp_path):
+    seed = tmp_path / "todo.json"
+    seed.write_text(json.dumps([make_todo(1), make_todo(2)]))
+    store = TodoStore(create_backend("sqlite", str(seed)))
+    assert [todo.id for todo in store.all()] == [1, 2]
+    store.delete(1)
+    store.close()
+
+    reopened = TodoStore(create_backend("sqlite", str(seed)))
+    assert [todo.id for todo in reopened.all()] == [2]
+
+
+def test_sqlite_workers_see_each_others_changes(tmp_path):
+    path = str(tmp_path / "todo.db")
+    worker_a = TodoStore(SqliteBackend(path))
+    worker_b = TodoStore(SqliteBackend(path))
+
+    worker_a.create(make_todo(1))
+    assert worker_b.get(1).title == "Task 1"
+
+    # 두 워커가 같은 항목에 하위 작업을 추가해도 서로 덮어쓰지 않는다
+    worker_a.add_subtask(1, {"id": 1, "title": "A", "completed": False})
+    worker_b.add_subtask(1, {"id": 2, "title": "B", "completed": False})
+    assert [st["title"] for st in worker_a.get(1).subtasks] == ["A", "B"]
+
+    # 메모리 상태가 뒤처진 워커도 DB에서 중복을 확인한다
+    worker_b._discard(1)
+    with pytest.raises(TodoAlreadyExists):
+        worker_b.create(make_todo(1))
+
+    # 일괄 생성 중 다른 워커와 id가 겹치면 그 항목만 실패한다
+    worker_a.create(make_todo(3))
+    worker_b.get(3)
+    worker_b._discard(3)
+    results = worker_b.create_many([make_todo(2), make_todo(3), make_todo(4)])
+    assert [type(result) for result in results] == [
+        type(None),
+        TodoAlreadyExists,
+        type(None),
+    ]
+    assert [todo.id for todo in worker_a.all()] == [1, 3, 2, 4]
+    for todo_id in (2, 3, 4):
+        worker_b.delete(todo_id)
+
+    worker_b.delete(1)
+    assert worker_a.get(1) is None
+    worker_b.replace([make_todo(5)])
+    assert [todo.id for todo in worker_a.all()] == [5]
+
+
+def test_sqlite_poll_keeps_own_pending_writes(tmp_path):
+    path = str(tmp_path / "todo.db")
+    worker_a = TodoStore(SqliteBackend(path), commit_window=0.002)
+    worker_b = TodoStore(SqliteBackend(path))
+    worker_a.create(make_todo(1))
+    worker_b.get(1)
+
+    queued, release = threading.Event(), threading.Event()
+    write = worker_a.backend.write
+
+    def slow_write(ops):
+        queued.set()
+        release.wait()
+        write(ops)
+
+    worker_a.backend.write = slow_write
+    writer = threading.Thread(target=worker_a.update, args=(1, {"status": "완료"}))
+    writer.start()
+    assert queued.wait(1)
+    # A의 변경이 기록되기 전에 B의 변경을 반영해도 A의 변경은 메모리에 남는다
+    worker_b.update(1, {"title": "from B"})
+    todo = worker_a.get(1)
+    release.set()
+    writer.join()
+    assert (todo.title, todo.status) == ("from B", "완료")
+
+    for store in (worker_a, worker_b, TodoStore(SqliteBackend(path))):
+        todo = store.get(1)
+        assert (todo.title, todo.status) == ("from B", "완료")
+    worker_a.close()
+    worker_b.close()
+
+
+def test_sqlite_versions_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "todo.db")
+    worker_a = TodoStore(SqliteBackend(path), commit_window=0)
+    worker_b = TodoStore(SqliteBackend(path))
+    assert worker_a.instance == worker_b.instance
+
+    subtask = {"id": 1, "title": "Sub", "completed": False}
+    worker_a.create(make_todo(1, subtasks=[subtask]))
+    worker_a.create(make_todo(2))
+    since = worker_b.version()
+    assert worker_a.version() == since
+
+    worker_a.delete_subtask(1, 1)
+    worker_a.delete(2)
+    worker_b.create(make_todo(3))
+    assert worker_a.version() == worker_b.version() > since
+
+    # 한 워커에서 받은 버전으로 다른 워커에 변경분을 물어도 된다
+    for store in (worker_a, worker_b):
+        version, changes = store.changes(since)
+        assert version == worker_a.version()
+        assert [todo.id for todo in changes["todos"]] == [1, 3]
+        assert changes["deleted"] == [2]
+        assert changes["deleted_subtasks"] == [(1, 1)]
+        assert store.changes(version)[1]["todos"] == []
+        assert store.changes(-1)[1] is None
+    worker_a.close()
+    worker_b.close()
+
+
+def test_sqlite_uses_indexes(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "todo.db"))
+    plans = {
+        query: " ".join(
+            row[3]
+            for row in backend._conn.execute(f"EXPLAIN QUERY PLAN {query}", ("x",))
+        )
+        for query in (
+            "SELECT * FROM todos WHERE status = ?",
+            "SELECT * FROM todos WHERE priority = ?",
+            "SELECT * FROM todos WHERE due_date < ?",
+        )
+    }
+    assert all("USING INDEX" in plan for plan in plans.values())
@@ -0,0 +1,161 @@
+"""첨부 파일 업로드 수신.
+
+multipart 요청 본문을 받는 대로 파싱해, 파일 데이터를 업로드 디렉터리의 임시 파일에
+조각 단위로 기록한다. 파일 쓰기와 해시 계산은 스레드 풀에서 하므로 큰 파일을 받는
+동안에도 이벤트 루프가 막히지 않는다. 다 받은 파일은 persist()로 최종 경로에
+원자적으로 옮겨진다 (같은 디렉터리 안의 rename).
+"""
+
+import hashlib
+import os
+import tempfile
+
+import python_multipart
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartState, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# multipart 경계/헤더 등 파일 데이터 외 본문 크기의 여유분
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """파일이 최대 크기를 넘었다."""
+
+
+class InvalidUpload(ValueError):
+    """multipart 본문이 잘못되었거나 파일 필드가 없다."""
+
+
+class ReceivedFile:
+    """임시 파일로 받은 업로드. persist() 또는 discard()로 정리해야 한다."""
+
+    def __init__(self, directory):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self.filename = None
+        self.content_type = None
+        self.size = 0
+        self.sha256 = None
+
+    def write(self, chunks):
+        for chunk in chunks:
+            self._file.write(chunk)
+            self._hash.update(chunk)
+
+    def finish(self):
+        self._file.flush()
+        self.sha256 = self._hash.hexdigest()
+
+    @property
+    def pending(self):
+        """아직 persist()/discard()되지 않았는지 여부."""
+        return not self._file.closed
+
+    def persist(self, path):
+        """디스크에 동기화한 뒤 path로 옮긴다."""
+        # mkstemp는 소유자만 읽을 수 있게 만들므로 일반 파일과 같은 권한으로 바꾼다
+        os.fchmod(self._file.fileno(), 0o644)
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.path, path)
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+async def receive_upload(headers, stream, directory, max_size, field="file"):
+    """요청 본문(stream)에서 field 이름의 파일 하나를 받아 ReceivedFile로 반환한다.
+
+    파일이 max_size 바이트를 넘으면 받는 도중 UploadTooLarge를 일으킨다.
+    Content-Length로 이미 넘는 것을 알 수 있으면 본문을 읽지 않는다.
+    """
+    content_length = headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLarge(max_size)
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("Expected multipart/form-data")
+
+    received = ReceivedFile(directory)
+    # 파서 콜백은 동기 함수이므로 데이터만 모아 두고, 조각마다 스레드 풀에서 기록한다
+    part = {}
+    pending = []
+
+    def on_part_begin():
+        part.clear()
+        part["headers"] = {}
+
+    def on_header_field(data, start, end):
+        part["field"] = part.get("field", b"") + data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] = part.get("value", b"") + data[start:end]
+
+    def on_header_end():
+        name = part.pop("field", b"").lower()
+        part["headers"][name] = part.pop("value", b"")
+
+    def on_headers_finished():
+        _, options = parse_options_header(
+            part["headers"].get(b"content-disposition", b"")
+        )
+        part["is_file"] = options.get(b"name") == field.encode() and (
+            b"filename" in options
+        )
+        if not part["is_file"]:
+            return
+        if received.filename is not None:
+            raise InvalidUpload("Only one file can be uploaded")
+        received.filename = options[b"filename"].decode("utf-8", "replace")
+        received.content_type = (
+            part["headers"].get(b"content-type", b"application/octet-stream").decode()
+        )
+
+    def on_part_data(data, start, end):
+        if not part.get("is_file"):
+            return
+        received.size += end - start
+        if received.size > max_size:
+            raise UploadTooLarge(max_size)
+        pending.append(data[start:end])
+
+    parser = python_multipart.MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        },
+    )
+    try:
+        async for chunk in stream:
+            try:
+                parser.write(chunk)
+            except FormParserError as exc:
+                raise InvalidUpload("Invalid multipart data") from exc
+            if pending:
+                chunks = pending[:]
+                pending.clear()
+                await run_in_threadpool(received.write, chunks)
+        try:
+            parser.finalize()
+        except FormParserError as exc:
+            raise InvalidUpload("Invalid multipart data") from exc
+        # 닫는 경계까지 오지 않았다면 연결이 중간에 끊긴 본문이다
+        if parser.state != MultipartState.END:
+            raise InvalidUpload("Incomplete multipart data")
+        if received.filename is None:
+            raise InvalidUpload(f"Missing file field: {field}")
+        await run_in_threadpool(received.finish)
+    except BaseException:
+        await run_in_threadpool(received.discard)
+        raise
+    return received
@@ -90,6 +90,18 @@ export async function updateSubtask(
   return res.data;
 }
 
+export async function patchSubtask(
+  todoId: number,
+  subtaskId: number,
+  fields: Partial<Omit<SubTask, "id">>
+): Promise<SubTask> {
+  const res = await api.patch<SubTask>(
+    `/${todoId}/subtasks/${subtaskId}`,
+    fields
+  );
+  return res.data;
+}
+
 export async function deleteSubtask(
   todoId: number,
   subtaskId: number
@@ -102,8 +114,7 @@ export async function toggleSubtaskCompletion(
   subtaskId: number,
   subtask: SubTask
 ): Promise<SubTask> {
-  const updatedSubtask = { ...subtask, completed: !subtask.completed };
-  return updateSubtask(todoId, subtaskId, updatedSubtask);
+  return patchSubtask(todoId, subtaskId, { completed: !subtask.completed });
 }
 
 export async function uploadAttachment(
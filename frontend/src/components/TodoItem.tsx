@@ -7,7 +7,7 @@ import {
   addSubtask,
   deleteSubtask,
   fetchSubtasks,
-  updateSubtask,
+  patchSubtask,
   fetchAttachments,
 } from "../api";
 import { SubTaskList } from "./SubTaskList";
@@ -107,7 +107,16 @@ export const TodoItem = ({
     updatedSubtask: SubTask
   ) => {
     try {
-      await updateSubtask(todoId, subtaskId, updatedSubtask);
+      // 바뀐 필드만 PATCH로 보낸다
+      const current = subtasks.find((st) => st.id === subtaskId);
+      const changes: Partial<Omit<SubTask, "id">> = {};
+      if (current?.title !== updatedSubtask.title) {
+        changes.title = updatedSubtask.title;
+      }
+      if (current?.completed !== updatedSubtask.completed) {
+        changes.completed = updatedSubtask.completed;
+      }
+      await patchSubtask(todoId, subtaskId, changes);
       setSubtasks(
         subtasks.map((st) => (st.id === subtaskId ? updatedSubtask : st))
       );
@@ -32,6 +32,8 @@ export type Attachment = {
   original_filename: string;
   file_type: string;
   upload_date: string;
+  size?: number | null;
+  sha256?: string | null;
 };
 
 // 대시보드 관련 타입 정의